@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Alert engine yang dievaluasi di ingest path
+
+Per sensor disimpan state Normal/Waspada/Bahaya. Perubahan state hanya
+terjadi jika:
+- hysteresis: untuk turun ke state yang lebih ringan, nilai harus masuk
+  ke band yang lebih ringan minimal sejauh `hysteresis`
+- minimum duration: state baru harus bertahan minimal `min_duration` detik
+- cooldown: setelah satu event, perubahan ke state yang lebih ringan (atau
+  sama) ditahan selama `cooldown` detik; eskalasi tetap langsung diproses
+Hanya perubahan state yang menghasilkan event.
+"""
+
+from psycopg2.extras import RealDictCursor, execute_values
+import logging
+import os
+import threading
+
+from threshold_engine import SEVERITY_NORMAL, SEVERITY_WASPADA, SEVERITY_BAHAYA
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_LABELS = {
+    SEVERITY_NORMAL: "Normal",
+    SEVERITY_WASPADA: "Waspada",
+    SEVERITY_BAHAYA: "Bahaya",
+}
+
+# Alert engine configuration (bisa diubah lewat environment variable)
+ALERT_CONFIG = {
+    "hysteresis": float(os.getenv("ALERT_HYSTERESIS", "0.5")),
+    "min_duration": float(os.getenv("ALERT_MIN_DURATION_S", "10")),
+    "cooldown": float(os.getenv("ALERT_COOLDOWN_S", "60")),
+}
+
+INSERT_ALERT_QUERY = """
+INSERT INTO sensor_alert (nama_sensor, waktu, from_severity, to_severity, status, nilai)
+VALUES %s
+"""
+
+# Event terakhir per sensor (memakai idx_sensor_alert_nama_waktu)
+LATEST_ALERT_QUERY = """
+SELECT DISTINCT ON (nama_sensor) nama_sensor, waktu, to_severity, nilai
+FROM sensor_alert
+ORDER BY nama_sensor, waktu DESC, id DESC
+"""
+
+class AlertEngine:
+    """State machine alert per sensor"""
+
+    def __init__(self, get_thresholds, hysteresis=0.5, min_duration=10.0, cooldown=60.0):
+        # get_thresholds: callable yang mengembalikan ThresholdEngine terbaru
+        self.get_thresholds = get_thresholds
+        self.hysteresis = hysteresis
+        self.min_duration = min_duration
+        self.cooldown = cooldown
+
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def restore(self, events):
+        """
+        Pulihkan state dari event terakhir per sensor saat startup, agar alert
+        yang masih aktif tidak dianggap Normal (dan tidak memicu event ulang).
+        Sensor yang sudah punya state dari data baru tidak ditimpa.
+        """
+        with self._lock:
+            for event in events:
+                if event["nama_sensor"] in self._states:
+                    continue
+                self._states[event["nama_sensor"]] = {
+                    "severity": event["to_severity"],
+                    "since": event["waktu"],
+                    "candidate": None,
+                    "candidate_since": None,
+                    "last_event": event["waktu"],
+                    "last_time": event["waktu"],
+                    "nilai": event["nilai"],
+                }
+        logger.info(f"Alert states restored for {len(events)} sensors")
+
+    def _effective_severity(self, thresholds, nama_sensor, nilai, current):
+        """Severity nilai dengan hysteresis untuk arah turun"""
+        severity = thresholds.classify(nama_sensor, nilai).severity
+        if severity >= current or not self.hysteresis:
+            return severity
+        # Turun hanya jika nilai +/- hysteresis juga masih di band yang lebih ringan
+        lower = thresholds.classify(nama_sensor, nilai - self.hysteresis).severity
+        upper = thresholds.classify(nama_sensor, nilai + self.hysteresis).severity
+        return max(severity, lower, upper)
+
+    def process(self, rows):
+        """
+        Evaluasi baris sensor (nama_sensor, tanggal, nilai, waktu) yang baru
+        di-commit. Mengembalikan list event perubahan state.
+        """
+        thresholds = self.get_thresholds()
+        events = []
+
+        with self._lock:
+            for nama_sensor, _, nilai, waktu, *_ in rows:
+                state = self._states.get(nama_sensor)
+                if state is None:
+                    state = {
+                        "severity": SEVERITY_NORMAL,
+                        "since": waktu,
+                        "candidate": None,
+                        "candidate_since": None,
+                        "last_event": None,
+                        "last_time": None,
+                    }
+                    self._states[nama_sensor] = state
+
+                # Data terlambat (out-of-order) tidak mengubah state
+                if state["last_time"] is not None and waktu < state["last_time"]:
+                    continue
+                state["last_time"] = waktu
+                state["nilai"] = nilai
+
+                severity = self._effective_severity(thresholds, nama_sensor, nilai, state["severity"])
+                if severity == state["severity"]:
+                    state["candidate"] = None
+                    continue
+
+                if severity != state["candidate"]:
+                    state["candidate"] = severity
+                    state["candidate_since"] = waktu
+                if (waktu - state["candidate_since"]).total_seconds() < self.min_duration:
+                    continue
+
+                escalation = severity > state["severity"]
+                if (not escalation and state["last_event"] is not None
+                        and (waktu - state["last_event"]).total_seconds() < self.cooldown):
+                    continue
+
+                events.append({
+                    "nama_sensor": nama_sensor,
+                    "waktu": waktu,
+                    "from_severity": state["severity"],
+                    "to_severity": severity,
+                    "status": thresholds.classify(nama_sensor, nilai).status,
+                    "nilai": nilai,
+                })
+                state["severity"] = severity
+                state["since"] = waktu
+                state["candidate"] = None
+                state["last_event"] = waktu
+
+        return events
+
+    def current_states(self):
+        """State alert terkini semua sensor"""
+        with self._lock:
+            return [
+                {
+                    "nama_sensor": name,
+                    "severity": state["severity"],
+                    "state": SEVERITY_LABELS[state["severity"]],
+                    "since": state["since"],
+                    "nilai": state.get("nilai"),
+                }
+                for name, state in sorted(self._states.items())
+            ]
+
+def save_alert_events(conn, events):
+    """Simpan event alert secara bulk (satu INSERT), commit oleh pemanggil"""
+    if not events:
+        return
+    cursor = conn.cursor()
+    execute_values(cursor, INSERT_ALERT_QUERY, [
+        (event["nama_sensor"], event["waktu"], event["from_severity"],
+         event["to_severity"], event["status"], event["nilai"])
+        for event in events
+    ])
+    cursor.close()
+
+def load_alert_states(conn):
+    """Event alert terakhir per sensor untuk AlertEngine.restore"""
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute(LATEST_ALERT_QUERY)
+    events = cursor.fetchall()
+    cursor.close()
+    return events
+
+def fetch_alert_events(conn, limit=50, nama_sensor=None):
+    """Ambil event alert terbaru"""
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    query = """
+    SELECT id, nama_sensor, waktu, from_severity, to_severity, status, nilai
+    FROM sensor_alert
+    {where}
+    ORDER BY waktu DESC, id DESC
+    LIMIT %s
+    """
+    if nama_sensor:
+        cursor.execute(query.format(where="WHERE nama_sensor = %s"), (nama_sensor, limit))
+    else:
+        cursor.execute(query.format(where=""), (limit,))
+    events = cursor.fetchall()
+    cursor.close()
+
+    for event in events:
+        event["from_state"] = SEVERITY_LABELS.get(event["from_severity"])
+        event["to_state"] = SEVERITY_LABELS.get(event["to_severity"])
+    return events
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Audit sink asynchronous untuk tabel transaksi_op
+
+Handler hanya memasukkan event ke antrian in-memory (ukuran terbatas),
+lalu thread writer menulisnya ke transaksi_op secara batch. Event yang
+tidak muat di antrian dihitung sebagai overflow, bukan memblokir request.
+
+Data yang masuk dari device bisa diringkas per sensor per jendela waktu
+(jumlah, min/max nilai, id pertama/terakhir) agar transaksi_op tidak tumbuh
+secepat tabel sensor. Aksi operator tetap dicatat satu per satu.
+"""
+
+from datetime import datetime
+from psycopg2.extras import execute_values
+import logging
+import os
+import queue
+import threading
+import time
+
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Mode audit untuk data dari device:
+#   "summary" -> satu baris ringkasan per sensor per jendela waktu
+#   "each"    -> satu baris per data sensor (perilaku lama)
+DEVICE_AUDIT_SUMMARY = "summary"
+DEVICE_AUDIT_EACH = "each"
+
+# Audit sink configuration (bisa diubah lewat environment variable)
+AUDIT_CONFIG = {
+    "flush_interval": float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "500")) / 1000,
+    "max_batch": int(os.getenv("AUDIT_MAX_BATCH", "500")),
+    "max_queue": int(os.getenv("AUDIT_MAX_QUEUE", "10000")),
+    "device_mode": os.getenv("AUDIT_DEVICE_MODE", DEVICE_AUDIT_SUMMARY),
+    "device_window": float(os.getenv("AUDIT_DEVICE_WINDOW_S", "60")),
+}
+
+INSERT_AUDIT_QUERY = """
+INSERT INTO transaksi_op (id_op, action, id_sensor, tanggal)
+VALUES %s
+"""
+
+_STOP = object()
+
+class AuditSink:
+    """Antrian event audit dengan writer batch di background thread"""
+
+    def __init__(self, flush_interval=0.5, max_batch=500, max_queue=10000,
+                 device_mode=DEVICE_AUDIT_SUMMARY, device_window=60.0):
+        if device_mode not in (DEVICE_AUDIT_SUMMARY, DEVICE_AUDIT_EACH):
+            raise ValueError(f"Unknown device audit mode: {device_mode}")
+
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.device_mode = device_mode
+        self.device_window = device_window
+
+        # nama_sensor -> ringkasan jendela yang sedang berjalan
+        self._windows = {}
+        self._windows_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "recorded": 0,
+            "dropped": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "device_readings": 0,
+            "device_summaries": 0,
+        }
+
+    def start(self):
+        """Jalankan thread writer"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Audit sink started (flush_interval={self.flush_interval * 1000:.0f}ms)")
+
+    def stop(self, timeout=10.0):
+        """Tulis sisa event lalu hentikan writer"""
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Audit sink stopped")
+
+    def record(self, id_op, action, id_sensor=None, tanggal=None):
+        """Masukkan satu event audit ke antrian (tidak pernah memblokir)"""
+        entry = (id_op, action, id_sensor, tanggal or datetime.now())
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["dropped"] += 1
+            return False
+
+        with self._stats_lock:
+            self._stats["recorded"] += 1
+        return True
+
+    def record_device_ingest(self, nama_sensor, nilai, sensor_id, tanggal=None):
+        """Catat data sensor dari device, diringkas per jendela waktu jika mode summary"""
+        tanggal = tanggal or datetime.now()
+
+        if self.device_mode == DEVICE_AUDIT_EACH:
+            return self.record(None, f"Data sensor {nama_sensor} dengan nilai {nilai} diterima dari ESP32", sensor_id, tanggal)
+
+        with self._windows_lock:
+            window = self._windows.get(nama_sensor)
+            if window is None:
+                self._windows[nama_sensor] = {
+                    "started": time.monotonic(),
+                    "count": 1,
+                    "min": nilai,
+                    "max": nilai,
+                    "first_id": sensor_id,
+                    "last_id": sensor_id,
+                    "last_time": tanggal,
+                }
+            else:
+                window["count"] += 1
+                window["min"] = min(window["min"], nilai)
+                window["max"] = max(window["max"], nilai)
+                window["last_id"] = sensor_id
+                window["last_time"] = tanggal
+
+        with self._stats_lock:
+            self._stats["device_readings"] += 1
+        return True
+
+    def _take_device_summaries(self, force=False):
+        """Ambil jendela yang sudah selesai dan ubah menjadi baris audit"""
+        now = time.monotonic()
+        with self._windows_lock:
+            expired = [name for name, window in self._windows.items()
+                       if force or now - window["started"] >= self.device_window]
+            windows = [(name, self._windows.pop(name)) for name in expired]
+
+        entries = []
+        for nama_sensor, window in windows:
+            action = (f"Ringkasan data sensor {nama_sensor}: {window['count']} data diterima dari ESP32 "
+                      f"(min {window['min']}, max {window['max']}, id {window['first_id']}-{window['last_id']})")
+            entries.append((None, action, window["last_id"], window["last_time"]))
+
+        if entries:
+            with self._stats_lock:
+                self._stats["device_summaries"] += len(entries)
+        return entries
+
+    def get_stats(self):
+        """Statistik audit sink untuk monitoring"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._windows_lock:
+            stats["open_device_windows"] = len(self._windows)
+        stats.update({
+            "device_mode": self.device_mode,
+            "device_window_s": self.device_window,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "running": bool(self._thread and self._thread.is_alive()),
+        })
+        return stats
+
+    def _write(self, entries):
+        if not entries:
+            return
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                execute_values(cursor, INSERT_AUDIT_QUERY, entries, page_size=len(entries))
+                conn.commit()
+                cursor.close()
+        except Exception as e:
+            logger.error(f"Error writing {len(entries)} audit events: {e}")
+            with self._stats_lock:
+                self._stats["failed"] += len(entries)
+            return
+
+        with self._stats_lock:
+            self._stats["written"] += len(entries)
+            self._stats["batches"] += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entries = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(entries) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                entries.append(item)
+            entries.extend(self._take_device_summaries())
+            self._write(entries)
+
+        # Drain sisa antrian sebelum berhenti
+        entries = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                entries.append(item)
+        entries.extend(self._take_device_summaries(force=True))
+        for start in range(0, len(entries), self.max_batch):
+            self._write(entries[start:start + self.max_batch])
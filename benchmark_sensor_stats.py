@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark query /sensor-stats: cara lama (N+1 query + COUNT(*)) vs query tunggal
+
+Data sintetis dibuat di schema terpisah (default: bench_stats) agar tabel
+produksi tidak tersentuh. Contoh:
+
+    python benchmark_sensor_stats.py --sensors 1000 --rows 50000000
+    python benchmark_sensor_stats.py --skip-seed --runs 50
+"""
+
+import argparse
+import statistics
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from database_config import DB_CONFIG
+from sensor_query import fetch_sensor_stats
+
+SEED_CHUNK = 1_000_000
+
+def seed(conn, schema, sensors, rows):
+    """Buat schema benchmark dan isi data sintetis"""
+    cursor = conn.cursor()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {schema}")
+    cursor.execute(f"SET search_path TO {schema}")
+
+    cursor.execute("""
+    CREATE TABLE acuan_baku (
+        id SERIAL PRIMARY KEY,
+        min FLOAT NOT NULL,
+        max FLOAT NOT NULL,
+        status VARCHAR(50) DEFAULT NULL
+    );
+    CREATE TABLE sensor_device (
+        id SERIAL PRIMARY KEY,
+        nama_sensor VARCHAR(100) NOT NULL UNIQUE,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE sensor (
+        id SERIAL PRIMARY KEY,
+        id_device INTEGER NOT NULL,
+        tanggal DATE NOT NULL,
+        nilai FLOAT NOT NULL,
+        waktu TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE sensor_daily_count (
+        tanggal DATE PRIMARY KEY,
+        jumlah BIGINT NOT NULL DEFAULT 0
+    );
+    INSERT INTO acuan_baku (min, max, status) VALUES
+    (20.0, 35.0, 'Normal'),
+    (15.0, 40.0, 'Waspada'),
+    (10.0, 45.0, 'Bahaya');
+    """)
+    cursor.execute("""
+    INSERT INTO sensor_device (id, nama_sensor)
+    SELECT g, 'sensor_' || g FROM generate_series(1, %s) g
+    """, (sensors,))
+    conn.commit()
+
+    # Setiap sensor mengirim data tiap 5 detik, data terakhir = sekarang
+    print(f"🌱 Seeding {rows:,} rows for {sensors:,} sensors...")
+    started = time.monotonic()
+    for offset in range(0, rows, SEED_CHUNK):
+        upper = min(offset + SEED_CHUNK, rows)
+        cursor.execute("""
+        INSERT INTO sensor (id_device, tanggal, nilai, waktu)
+        SELECT 1 + g %% %(sensors)s,
+               (now() - ((%(rows)s - g) / %(sensors)s) * interval '5 seconds')::date,
+               15 + random() * 25,
+               now() - ((%(rows)s - g) / %(sensors)s) * interval '5 seconds'
+        FROM generate_series(%(lower)s, %(upper)s) g
+        """, {"sensors": sensors, "rows": rows, "lower": offset + 1, "upper": upper})
+        conn.commit()
+        print(f"   {upper:,} rows ({time.monotonic() - started:.0f}s)")
+
+    print("🔧 Building index, counters and statistics...")
+    cursor.execute("CREATE INDEX idx_sensor_device_waktu ON sensor (id_device, waktu DESC)")
+    cursor.execute("CREATE INDEX idx_sensor_waktu ON sensor (waktu DESC)")
+    cursor.execute("""
+    INSERT INTO sensor_daily_count (tanggal, jumlah)
+    SELECT tanggal, COUNT(*) FROM sensor GROUP BY tanggal
+    """)
+    conn.commit()
+
+    old_isolation = conn.isolation_level
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    cursor.execute("VACUUM ANALYZE sensor")
+    conn.set_isolation_level(old_isolation)
+    cursor.close()
+
+def legacy_stats(conn):
+    """Query /sensor-stats versi lama: DISTINCT + 1 query per sensor + 2x COUNT(*)"""
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute("SELECT COUNT(*) as total FROM sensor")
+    cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) as today_count FROM sensor WHERE tanggal = CURRENT_DATE")
+    cursor.fetchone()
+    cursor.execute("SELECT DISTINCT id_device FROM sensor")
+    unique_sensors = [row['id_device'] for row in cursor.fetchall()]
+    cursor.execute("SELECT id, id_device, tanggal, nilai, waktu FROM sensor ORDER BY waktu DESC LIMIT 50")
+    cursor.fetchall()
+    cursor.execute("SELECT min, max, status FROM acuan_baku ORDER BY id")
+    cursor.fetchall()
+    for sensor_name in unique_sensors:
+        cursor.execute("""
+        SELECT nilai FROM sensor
+        WHERE id_device = %s
+        ORDER BY waktu DESC
+        LIMIT 1
+        """, (sensor_name,))
+        cursor.fetchone()
+    cursor.close()
+
+def measure(label, func, conn, runs):
+    """Jalankan func beberapa kali dan tampilkan latency"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(conn)
+        conn.rollback()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<22} runs={runs:<4} p50={statistics.median(timings):10.1f} ms  "
+          f"p95={p95:10.1f} ms  max={timings[-1]:10.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /sensor-stats queries")
+    parser.add_argument("--schema", default="bench_stats")
+    parser.add_argument("--sensors", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--legacy-runs", type=int, default=3)
+    parser.add_argument("--skip-seed", action="store_true", help="Pakai data benchmark yang sudah ada")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if not args.skip_seed:
+            seed(conn, args.schema, args.sensors, args.rows)
+
+        cursor = conn.cursor()
+        cursor.execute(f"SET search_path TO {args.schema}")
+        cursor.execute("SELECT SUM(jumlah) FROM sensor_daily_count")
+        total = cursor.fetchone()[0]
+        cursor.close()
+        conn.commit()
+
+        print(f"📊 Benchmark /sensor-stats on {total:,} rows")
+        measure("single query (new)", fetch_sensor_stats, conn, args.runs)
+        measure("N+1 + COUNT(*) (old)", legacy_stats, conn, args.legacy_runs)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -90,9 +90,10 @@ def check_sensor_table():
             
             # Get sample data
             cursor.execute("""
-                SELECT id, nama_sensor, tanggal, nilai, waktu
-                FROM sensor
-                ORDER BY waktu DESC
+                SELECT s.id, d.nama_sensor, s.tanggal, s.nilai, s.waktu
+                FROM sensor s
+                JOIN sensor_device d ON d.id = s.id_device
+                ORDER BY s.waktu DESC
                 LIMIT 10
             """)
             
@@ -103,15 +104,16 @@ def check_sensor_table():
                       f"Nilai: {record['nilai']}, Waktu: {record['waktu']}")
             
             # Get unique sensors
-            cursor.execute("SELECT DISTINCT nama_sensor FROM sensor")
+            cursor.execute("SELECT nama_sensor FROM sensor_device ORDER BY nama_sensor")
             unique_sensors = [row['nama_sensor'] for row in cursor.fetchall()]
             print(f"\n🔍 Unique Sensors: {unique_sensors}")
             
             # Get data count by sensor
             cursor.execute("""
-                SELECT nama_sensor, COUNT(*) as count
-                FROM sensor
-                GROUP BY nama_sensor
+                SELECT d.nama_sensor, COUNT(*) as count
+                FROM sensor s
+                JOIN sensor_device d ON d.id = s.id_device
+                GROUP BY d.nama_sensor
                 ORDER BY count DESC
             """)
             
@@ -139,9 +141,10 @@ def check_recent_data():
             
             # Get latest 50 records for chart
             cursor.execute("""
-                SELECT id, nama_sensor, tanggal, nilai, waktu
-                FROM sensor
-                ORDER BY waktu DESC
+                SELECT s.id, d.nama_sensor, s.tanggal, s.nilai, s.waktu
+                FROM sensor s
+                JOIN sensor_device d ON d.id = s.id_device
+                ORDER BY s.waktu DESC
                 LIMIT 50
             """)
             
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker untuk akses database di ingest path
+
+closed    -> semua request ke database
+open      -> database dianggap mati, request langsung dialihkan (tanpa
+             menunggu timeout koneksi) sampai reset_timeout habis
+half_open -> satu request percobaan; berhasil = closed, gagal = open lagi
+"""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Circuit breaker configuration (bisa diubah lewat environment variable)
+BREAKER_CONFIG = {
+    "failure_threshold": int(os.getenv("DB_BREAKER_FAILURES", "3")),
+    "reset_timeout": float(os.getenv("DB_BREAKER_RESET_S", "10")),
+}
+
+class CircuitOpen(Exception):
+    """Request tidak dijalankan karena circuit sedang open"""
+
+class CircuitBreaker:
+    """Circuit breaker thread-safe berdasarkan jumlah gagal berturut-turut"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=10.0, errors=(Exception,)):
+        # errors: exception yang dihitung sebagai kegagalan (mis. DB_UNAVAILABLE_ERRORS)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.errors = errors
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._stats = {"opened": 0, "rejected": 0, "last_opened": None, "last_closed": None}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def available(self):
+        """True jika allow() kemungkinan mengizinkan request (tanpa mengubah state)"""
+        with self._lock:
+            if self._state == STATE_OPEN:
+                return time.monotonic() - self._opened_at >= self.reset_timeout
+            return self._state == STATE_CLOSED or not self._probe_in_flight
+
+    def allow(self):
+        """True jika request boleh ke database"""
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def call(self, fn, *args, **kwargs):
+        """Jalankan fn lewat breaker; CircuitOpen jika circuit sedang open"""
+        if not self.allow():
+            raise CircuitOpen("Database circuit open")
+        try:
+            result = fn(*args, **kwargs)
+        except self.errors:
+            self.record_failure()
+            raise
+        except Exception:
+            # Database bisa dihubungi, error berasal dari data/query
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def record_success(self):
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                logger.info("🟢 Database circuit closed")
+                self._stats["last_closed"] = time.time()
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != STATE_OPEN:
+                    logger.warning(f"🔴 Database circuit open after {self._failures} failures")
+                    self._stats["opened"] += 1
+                    self._stats["last_opened"] = time.time()
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+            })
+        return stats
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Control loop sistem pendingin di server
+
+Controller berlangganan data sensor yang baru di-commit (ingest path) dan
+menentukan cooling ON/OFF dari batas atas rentang Normal acuan_baku.
+Setiap sensor punya state panas sendiri (panas jika nilai > max, normal lagi
+jika nilai <= max - hysteresis); cooling ON jika ada sensor yang panas dan
+OFF hanya jika semua sensor sudah normal, sehingga sensor panas dan sensor
+normal yang bergantian tidak membuat actuator on/off terus. Perubahan state
+dikirim ke actuator dan disimpan ke tabel cooling_state, sehingga kontrol
+tetap berjalan walaupun tidak ada browser yang terbuka.
+"""
+
+from datetime import datetime
+from psycopg2.extras import RealDictCursor
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+MODE_AUTO = "auto"
+MODE_MANUAL = "manual"
+
+# Cooling control configuration (bisa diubah lewat environment variable)
+COOLING_CONFIG = {
+    "mode": os.getenv("COOLING_MODE", MODE_AUTO),
+    "hysteresis": float(os.getenv("COOLING_HYSTERESIS", "1.0")),
+    # Kosong = semua sensor dipakai untuk kontrol
+    "sensor": os.getenv("COOLING_SENSOR") or None,
+}
+
+class SimulatedActuator:
+    """Actuator lokal untuk testing: hanya mencatat state dan jumlah switching"""
+
+    name = "simulated"
+
+    def __init__(self):
+        self.is_on = False
+        self.switch_count = 0
+
+    def set_state(self, is_on):
+        if is_on != self.is_on:
+            self.switch_count += 1
+        self.is_on = is_on
+        logger.info(f"❄️ [simulated actuator] cooling {'ON' if is_on else 'OFF'}")
+
+    def get_stats(self):
+        return {"actuator": self.name, "is_on": self.is_on, "switch_count": self.switch_count}
+
+class CoolingController:
+    """Keputusan cooling ON/OFF dari data sensor dan acuan baku"""
+
+    def __init__(self, get_thresholds, actuator, mode=MODE_AUTO, hysteresis=1.0, sensor=None):
+        if mode not in (MODE_AUTO, MODE_MANUAL):
+            raise ValueError(f"Unknown cooling mode: {mode}")
+
+        # get_thresholds: callable yang mengembalikan ThresholdEngine terbaru
+        self.get_thresholds = get_thresholds
+        self.actuator = actuator
+        self.hysteresis = hysteresis
+        self.sensor = sensor
+
+        self._lock = threading.Lock()
+        self._state = {
+            "is_on": False,
+            "mode": mode,
+            "reason": "startup",
+            "nama_sensor": None,
+            "nilai": None,
+            "updated_at": None,
+        }
+        self._last_reaction_ms = None
+        self._last_time = {}  # Waktu data terakhir per sensor
+        self._hot = {}  # Sensor yang masih di atas batas (dengan hysteresis)
+
+    def restore(self, state):
+        """Pulihkan state terakhir dari database saat startup"""
+        if not state:
+            return
+        with self._lock:
+            self._state.update({key: state[key] for key in self._state if key in state})
+            # Sensor yang menyalakan cooling dianggap masih panas sampai datanya normal
+            if self._state["is_on"] and self._state["nama_sensor"]:
+                self._hot[self._state["nama_sensor"]] = True
+            self.actuator.set_state(self._state["is_on"])
+
+    def _apply(self, is_on, reason, nama_sensor=None, nilai=None, mode=None):
+        """Ubah state (lock sudah dipegang). Mengembalikan salinan state baru."""
+        self._state.update({
+            "is_on": is_on,
+            "reason": reason,
+            "nama_sensor": nama_sensor,
+            "nilai": nilai,
+            "updated_at": datetime.now(),
+        })
+        if mode:
+            self._state["mode"] = mode
+        self.actuator.set_state(is_on)
+        return dict(self._state)
+
+    def process(self, rows):
+        """
+        Evaluasi baris sensor (nama_sensor, tanggal, nilai, waktu) yang baru
+        di-commit. Mengembalikan state baru jika cooling berubah, atau None.
+        """
+        thresholds = self.get_thresholds()
+        change = None
+
+        with self._lock:
+            for nama_sensor, _, nilai, waktu, *_ in rows:
+                if self.sensor and nama_sensor != self.sensor:
+                    continue
+                # Data terlambat (backfill dari device/gateway) tidak mengubah actuator
+                last_time = self._last_time.get(nama_sensor)
+                if last_time is not None and waktu < last_time:
+                    continue
+                self._last_time[nama_sensor] = waktu
+                _, high = thresholds.normal_range(nama_sensor)
+                if high is None:
+                    self._hot.pop(nama_sensor, None)
+                    continue
+
+                # State per sensor tetap diikuti di mode manual, agar kembali ke auto langsung benar
+                if nilai > high:
+                    self._hot[nama_sensor] = True
+                elif nilai <= high - self.hysteresis:
+                    self._hot.pop(nama_sensor, None)
+                if self._state["mode"] != MODE_AUTO:
+                    continue
+
+                if not self._state["is_on"] and self._hot:
+                    change = self._apply(True, f"Nilai {nilai} di atas batas {high}", nama_sensor, nilai)
+                elif self._state["is_on"] and not self._hot:
+                    change = self._apply(False, f"Semua sensor kembali normal (nilai {nilai} <= {high - self.hysteresis})", nama_sensor, nilai)
+                else:
+                    continue
+
+                # Latency dari waktu data diterima sampai actuator diubah
+                self._last_reaction_ms = (datetime.now() - waktu).total_seconds() * 1000
+
+        return change
+
+    def set_manual(self, mode, is_on=None, operator=None):
+        """Ubah mode dan/atau state dari API. Mengembalikan state baru."""
+        if mode not in (MODE_AUTO, MODE_MANUAL):
+            raise ValueError(f"Mode harus {MODE_AUTO} atau {MODE_MANUAL}")
+        with self._lock:
+            if is_on is None:
+                is_on = self._state["is_on"]
+            reason = f"Diubah manual{f' oleh operator {operator}' if operator else ''} (mode {mode})"
+            return self._apply(is_on, reason, mode=mode)
+
+    def get_state(self):
+        with self._lock:
+            state = dict(self._state)
+        state["last_reaction_ms"] = self._last_reaction_ms
+        state.update(self.actuator.get_stats())
+        return state
+
+def save_cooling_state(conn, state):
+    """Simpan perubahan state cooling (commit oleh pemanggil)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+    INSERT INTO cooling_state (waktu, is_on, mode, reason, nama_sensor, nilai)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """, (state["updated_at"], state["is_on"], state["mode"], state["reason"],
+          state["nama_sensor"], state["nilai"]))
+    cursor.close()
+
+def load_cooling_state(conn):
+    """State cooling terakhir yang tersimpan, atau None"""
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute("""
+    SELECT waktu AS updated_at, is_on, mode, reason, nama_sensor, nilai
+    FROM cooling_state
+    ORDER BY waktu DESC, id DESC
+    LIMIT 1
+    """)
+    state = cursor.fetchone()
+    cursor.close()
+    return state
+
+def fetch_cooling_history(conn, limit=50):
+    """Riwayat perubahan state cooling"""
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute("""
+    SELECT id, waktu, is_on, mode, reason, nama_sensor, nilai
+    FROM cooling_state
+    ORDER BY waktu DESC, id DESC
+    LIMIT %s
+    """, (limit,))
+    history = cursor.fetchall()
+    cursor.close()
+    return history
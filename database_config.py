@@ -4,9 +4,12 @@ Database configuration with connection pooling
 """
 
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extensions, pool
 import contextlib
 import logging
+import os
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +24,14 @@ DB_CONFIG = {
     "port": "5432"
 }
 
-# Connection pool configuration
+# Connection pool configuration (ukuran pool bisa diatur lewat environment variable)
 POOL_CONFIG = {
-    "minconn": 1,      # Minimum connections in pool
-    "maxconn": 10,     # Maximum connections in pool
+    "minconn": int(os.getenv("DB_POOL_MIN", "1")),           # Minimum connections in pool
+    "maxconn": int(os.getenv("DB_POOL_MAX", "10")),          # Maximum connections in pool
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),    # Detik menunggu koneksi bebas
+    "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "60")),  # Validasi koneksi yang idle lebih lama dari ini
+    "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),  # Ganti koneksi yang lebih tua dari ini
+    "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "3")),  # Detik menunggu koneksi baru saat database mati
     "host": DB_CONFIG["host"],
     "database": DB_CONFIG["database"],
     "user": DB_CONFIG["user"],
@@ -32,20 +39,205 @@ POOL_CONFIG = {
     "port": DB_CONFIG["port"]
 }
 
+# Error yang berarti database tidak bisa dipakai (server mati, koneksi putus,
+# pool habis), bukan error karena data/query
+DB_UNAVAILABLE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, pool.PoolError)
+
+class PoolTimeout(pool.PoolError):
+    """Tidak ada koneksi bebas dalam batas waktu tunggu"""
+
+class MonitoredConnectionPool:
+    """
+    Thread-safe connection pool dengan antrian tunggu.
+
+    Thread yang meminta koneksi saat pool penuh akan menunggu sampai ada
+    koneksi yang dikembalikan (maksimal `timeout` detik). Koneksi yang idle
+    lama divalidasi dulu, dan koneksi yang terlalu tua diganti baru.
+    """
+
+    def __init__(self, minconn, maxconn, timeout=10.0, max_idle=60.0, max_lifetime=1800.0, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, created_at, last_used)]
+        self._in_use = {}      # id(conn) -> created_at
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "acquired": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+        for _ in range(minconn):
+            conn = self._connect()
+            self._size += 1
+            self._idle.append((conn, time.monotonic(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _is_usable(self, conn, created_at, last_used):
+        """Cek apakah koneksi idle masih layak dipakai"""
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if self.max_idle and now - last_used > self.max_idle:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def getconn(self, timeout=None):
+        """Ambil koneksi, tunggu jika pool sedang penuh"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise pool.PoolError("connection pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No free connection after {timeout:.1f}s "
+                                          f"({self.maxconn} in use, {self._waiting} waiting)")
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            if entry is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+            else:
+                conn, created_at, last_used = entry
+                if not self._is_usable(conn, created_at, last_used):
+                    # Koneksi basi: tutup, lalu ulangi untuk ambil/buat koneksi lain
+                    self._discard(conn, recycled=True)
+                    continue
+
+            waited_ms = (time.monotonic() - started) * 1000
+            with self._cond:
+                self._in_use[id(conn)] = created_at
+                self._stats["acquired"] += 1
+                self._stats["total_wait_ms"] += waited_ms
+                self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], waited_ms)
+            return conn
+
+    def _discard(self, conn, recycled=False):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["recycled" if recycled else "discarded"] += 1
+            self._cond.notify()
+
+    def putconn(self, conn, close=False):
+        """Kembalikan koneksi ke pool"""
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            raise pool.PoolError("trying to put unkeyed connection")
+
+        if not close and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        if close or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Tutup semua koneksi idle; koneksi yang sedang dipakai ditutup saat dikembalikan"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self):
+        """Statistik pool untuk monitoring dan sizing"""
+        with self._cond:
+            stats = dict(self._stats)
+            acquired = stats["acquired"]
+            stats.update({
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+                "current_connections": len(self._in_use),
+                "available_connections": len(self._idle),
+                "open_connections": self._size,
+                "waiting": self._waiting,
+                "avg_wait_ms": stats["total_wait_ms"] / acquired if acquired else 0.0,
+            })
+        return stats
+
 # Global connection pool
 _connection_pool = None
+_pool_lock = threading.Lock()
 
 def get_connection_pool():
     """Get or create the connection pool"""
     global _connection_pool
     
     if _connection_pool is None:
-        try:
-            _connection_pool = pool.SimpleConnectionPool(**POOL_CONFIG)
-            logger.info("Connection pool created successfully")
-        except Exception as e:
-            logger.error(f"Failed to create connection pool: {e}")
-            raise
+        with _pool_lock:
+            if _connection_pool is None:
+                try:
+                    _connection_pool = MonitoredConnectionPool(**POOL_CONFIG)
+                    logger.info(f"Connection pool created successfully "
+                                f"(min={POOL_CONFIG['minconn']}, max={POOL_CONFIG['maxconn']})")
+                except Exception as e:
+                    logger.error(f"Failed to create connection pool: {e}")
+                    raise
     
     return _connection_pool
 
@@ -69,7 +261,7 @@ def get_db_connection():
         yield conn
     except Exception as e:
         logger.error(f"Database connection error: {e}")
-        if conn:
+        if conn and not conn.closed:
             conn.rollback()
         raise
     finally:
@@ -92,14 +284,8 @@ def test_connection():
 
 def get_connection_stats():
     """Get connection pool statistics"""
-    pool = get_connection_pool()
-    if pool:
-        return {
-            "minconn": pool.minconn,
-            "maxconn": pool.maxconn,
-            "current_connections": len(pool._used) if hasattr(pool, '_used') else 0,
-            "available_connections": len(pool._free) if hasattr(pool, '_free') else 0
-        }
+    if _connection_pool:
+        return _connection_pool.get_stats()
     return None
 
 # Cleanup on module unload
@@ -11,7 +11,7 @@ const char* password = "miliran24";
 #define DHTPIN 4      // Pin GPIO4 untuk koneksi DHT11
 #define DHTTYPE DHT11 // Tipe sensor DHT11
 
-// URL FastAPI
+// URL FastAPI (atau edge gateway di jaringan lokal, contoh http://192.168.1.2:8001/sensor-data)
 const char* serverUrl = "http://192.168.1.8:8000/sensor-data";
 
 // Inisialisasi objek DHT
@@ -1,11 +1,14 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel  # ← Tambahkan import ini
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError  # ← Tambahkan import ini
+from typing import Any, Dict, List, Optional
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime, date
 import json
 import uvicorn  # ← Tambahkan import ini
+import asyncio
 import hashlib  # ← Tambahkan import untuk hashing password
 import contextlib
 import logging
@@ -16,7 +19,35 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import database configuration
-from database_config import get_db_connection, test_connection
+from database_config import DB_UNAVAILABLE_ERRORS, get_connection_stats, get_db_connection, test_connection
+from sensor_ingest import (
+    DUPLICATE_READING, MAX_BATCH_SIZE,
+    build_sensor_row, claim_sequences, insert_sensor_rows, normalize_timestamp,
+)
+from sensor_query import (
+    fetch_sensor_delta, fetch_sensor_page, fetch_sensor_range, fetch_sensor_stats,
+    iter_sensor_rows, parse_cursor,
+)
+from sensor_rollup import fetch_rollup_series
+from sensor_partition import PARTITION_CONFIG, PartitionManager
+from sensor_device import DeviceRegistry, fetch_devices
+from sensor_archive import ARCHIVE_CONFIG, SensorArchiver
+from migrate import MIGRATE_ON_STARTUP, run_migrations
+from audit_log import AUDIT_CONFIG, AuditSink
+from live_updates import LiveBroadcaster
+from threshold_cache import ThresholdCache, notify_acuan_baku_changed
+from threshold_engine import SEVERITY_NORMAL
+from alert_engine import ALERT_CONFIG, AlertEngine, fetch_alert_events, load_alert_states, save_alert_events
+from latest_values import LATEST_VALUES_ENABLED, LatestValueStore
+from cooling_control import (
+    COOLING_CONFIG, CoolingController, SimulatedActuator,
+    fetch_cooling_history, load_cooling_state, save_cooling_state,
+)
+from ingest_buffer import INGEST_CONFIG, DURABILITY_ENQUEUE, IngestBuffer, IngestQueueFull
+from ingest_compression import COMPRESSION_CONFIG, IngestCompressor
+from request_encoding import GzipRequestMiddleware
+from circuit_breaker import BREAKER_CONFIG, CircuitBreaker, CircuitOpen
+from ingest_spool import SPOOL_CONFIG, SPOOLED_READING, IngestSpool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +55,11 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Sensor Monitoring API")
 
+# Endpoint yang mengakses database dideklarasikan dengan `def` biasa (bukan
+# `async def`) sehingga FastAPI menjalankannya di threadpool. Query psycopg2
+# yang blocking tidak lagi menghentikan event loop, dan endpoint async seperti
+# ingest ESP32 tetap berjalan saat ada query dashboard yang lambat.
+
 # ← Tambahkan CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +69,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Batch dari edge gateway dikirim dengan Content-Encoding: gzip
+app.add_middleware(GzipRequestMiddleware)
+
 # Test database connection on startup
 @app.on_event("startup")
 async def startup_event():
@@ -42,10 +81,58 @@ async def startup_event():
         logger.info("✅ Database connection successful!")
     else:
         logger.error("❌ Database connection failed! Please check your database configuration.")
+    
+    if MIGRATE_ON_STARTUP:
+        try:
+            applied = await asyncio.get_running_loop().run_in_executor(None, run_migrations)
+            logger.info(f"🗂️ Migrations applied: {applied or 'none (up to date)'}")
+        except Exception as e:
+            logger.error(f"❌ Database migration failed: {e}")
+    
+    # Sebelum ingest dimulai, agar data pertama dievaluasi dari state terakhir
+    await asyncio.get_running_loop().run_in_executor(None, restore_alert_states)
+    
+    broadcaster.attach_loop(asyncio.get_running_loop())
+    audit_sink.start()
+    spool.start()
+    ingest_buffer.start()
+    thresholds.start_listener()
+    partitions.start()
+    archiver.start()
+    await asyncio.get_running_loop().run_in_executor(None, load_devices)
+    await asyncio.get_running_loop().run_in_executor(None, restore_cooling_state)
+    
+    if LATEST_VALUES_ENABLED:
+        # Warm-up di background, endpoint memakai database sampai store siap
+        asyncio.get_running_loop().run_in_executor(None, warm_latest_values)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Tulis sisa data di antrian ingest sebelum aplikasi berhenti"""
+    logger.info("🛑 Draining ingest buffer...")
+    await asyncio.get_running_loop().run_in_executor(None, ingest_buffer.stop)
+    await asyncio.get_running_loop().run_in_executor(None, flush_compressed_rows)
+    await asyncio.get_running_loop().run_in_executor(None, spool.stop)
+    await asyncio.get_running_loop().run_in_executor(None, audit_sink.stop)
+    await asyncio.get_running_loop().run_in_executor(None, thresholds.stop_listener)
+    await asyncio.get_running_loop().run_in_executor(None, partitions.stop)
+    await asyncio.get_running_loop().run_in_executor(None, archiver.stop)
 
 class SensorData(BaseModel):
     nama_sensor: str
     nilai: float
+    waktu: Optional[datetime] = None  # Timestamp dari device (default: jam server)
+    seq: Optional[int] = None  # Nomor urut per sensor untuk dedupe pengiriman ulang
+
+class SensorReading(BaseModel):
+    nama_sensor: str
+    nilai: float
+    waktu: Optional[datetime] = None  # Timestamp dari device/gateway
+    seq: Optional[int] = None
+
+class SensorDataBatch(BaseModel):
+    # Divalidasi per baris agar satu data rusak tidak menggagalkan seluruh batch
+    readings: List[Dict[str, Any]]
 
 class AcuanBakuData(BaseModel):
     min: float
@@ -68,28 +155,210 @@ class OperatorLogin(BaseModel):
     email: str
     password: str
 
-def log_transaction(conn, id_op, action, id_sensor=None):
-    """Fungsi untuk mencatat transaksi operator ke tabel transaksi_op"""
+class CoolingCommand(BaseModel):
+    mode: str = "manual"            # auto / manual
+    is_on: Optional[bool] = None    # Hanya dipakai untuk mode manual
+    id_op: Optional[int] = None
+
+audit_sink = AuditSink(**AUDIT_CONFIG)
+broadcaster = LiveBroadcaster()
+latest_values = LatestValueStore()
+db_breaker = CircuitBreaker(errors=DB_UNAVAILABLE_ERRORS, **BREAKER_CONFIG)
+thresholds = ThresholdCache(breaker=db_breaker)
+partitions = PartitionManager(**PARTITION_CONFIG)
+devices = DeviceRegistry()
+compressor = IngestCompressor(**COMPRESSION_CONFIG)
+archiver = SensorArchiver(**ARCHIVE_CONFIG)
+alert_engine = AlertEngine(thresholds.get_engine, **ALERT_CONFIG)
+# Ganti SimulatedActuator dengan driver relay/AC yang sebenarnya
+cooling = CoolingController(thresholds.get_engine, SimulatedActuator(), **COOLING_CONFIG)
+
+def log_transaction(id_op, action, id_sensor=None):
+    """Fungsi untuk mencatat transaksi operator ke tabel transaksi_op (asynchronous lewat audit sink)"""
+    if not audit_sink.record(id_op, action, id_sensor):
+        logger.warning(f"Audit queue penuh, transaksi tidak tercatat: {action}")
+
+def load_devices():
+    """Isi cache nama sensor -> id_device dari database"""
+    try:
+        with get_db_connection() as conn:
+            devices.load(conn)
+    except Exception as e:
+        logger.error(f"❌ Failed to load device registry: {e}")
+
+def warm_latest_values():
+    """Isi latest-value store dari database"""
+    try:
+        with get_db_connection() as conn:
+            latest_values.warm(conn)
+    except Exception as e:
+        logger.error(f"❌ Failed to warm latest-value store: {e}")
+
+def process_alerts(rows):
+    """Evaluasi alert engine dan simpan event perubahan state secara bulk"""
     try:
-        cursor = conn.cursor()
-        query = """
-        INSERT INTO transaksi_op (id_op, action, id_sensor, tanggal)
-        VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(query, (id_op, action, id_sensor, datetime.now()))
+        events = alert_engine.process(rows)
+        if not events:
+            return
+        with get_db_connection() as conn:
+            save_alert_events(conn, events)
+            conn.commit()
+    except Exception as e:
+        logger.error(f"Error processing alerts: {e}")
+        return
+    
+    for event in events:
+        broadcaster.publish("alert", event)
+
+def restore_alert_states():
+    """Pulihkan state alert per sensor dari event terakhir di database"""
+    try:
+        with get_db_connection() as conn:
+            alert_engine.restore(load_alert_states(conn))
+    except Exception as e:
+        logger.error(f"❌ Failed to restore alert states: {e}")
+
+def restore_cooling_state():
+    """Pulihkan state cooling terakhir dari database"""
+    try:
+        with get_db_connection() as conn:
+            cooling.restore(load_cooling_state(conn))
+    except Exception as e:
+        logger.error(f"❌ Failed to restore cooling state: {e}")
+
+def save_cooling_state_now(state):
+    with get_db_connection() as conn:
+        save_cooling_state(conn, state)
         conn.commit()
-        cursor.close()
+
+def persist_cooling_state(state):
+    """Simpan perubahan state cooling dan kirim ke dashboard"""
+    try:
+        db_breaker.call(save_cooling_state_now, state)
+    except Exception as e:
+        logger.error(f"Error saving cooling state: {e}")
+    
+    broadcaster.publish("cooling", state)
+
+def process_cooling(rows):
+    """Control loop cooling: dievaluasi langsung setelah data di-commit"""
+    try:
+        state = cooling.process(rows)
+    except Exception as e:
+        logger.error(f"Error processing cooling control: {e}")
+        return
+    
+    if state:
+        persist_cooling_state(state)
+
+def on_sensor_rows_committed(rows, stored_rows, sensor_ids):
+    """
+    Dipanggil setelah data sensor di-commit. Cooling dan alert memakai semua
+    data (termasuk yang tidak disimpan karena kompresi), audit log dan live
+    update dashboard hanya baris yang disimpan.
+    """
+    process_cooling(rows)
+    process_alerts(rows)
+    
+    # Log transaksi data sensor (tanpa id_op karena dari ESP32), diringkas per sensor
+    for row, sensor_id in zip(stored_rows, sensor_ids):
+        audit_sink.record_device_ingest(row[0], row[2], sensor_id, row[3])
+    
+    if sensor_ids:
+        # Format kolumnar sama seperti GET /sensor-data/since
+        broadcaster.publish("readings", {
+            "id": sensor_ids,
+            "nama_sensor": [row[0] for row in stored_rows],
+            "nilai": [row[2] for row in stored_rows],
+            "waktu": [row[3].isoformat() for row in stored_rows],
+            "last_id": max(sensor_ids)
+        })
+
+def write_sensor_batch(rows):
+    """
+    Tulis satu batch data sensor (ingest buffer / endpoint batch) dalam satu
+    transaksi: dedupe (sensor, seq), ingest compression, lalu insert. Mengembalikan
+    list hasil sesuai urutan rows: id sensor, None untuk data yang tidak disimpan
+    (dalam toleransi) atau DUPLICATE_READING untuk seq yang sudah pernah diterima.
+    """
+    device_ids = devices.resolve(row[0] for row in rows)
+    checkpoint = compressor.checkpoint(row[0] for row in rows)
+    try:
+        with latest_values.committing():
+            with get_db_connection() as conn:
+                fresh = claim_sequences(conn, rows, device_ids)
+                accepted = [row for row, is_fresh in zip(rows, fresh) if is_fresh]
+                compressed = compressor.process(accepted)
+                stored_rows = [row for row, _ in compressed]
+                sensor_ids = insert_sensor_rows(conn, stored_rows, device_ids, rollup_rows=accepted)
+                conn.commit()
+            # Semua data (sama seperti rollup), di dalam gate warm-up latest-value store
+            latest_values.update_rows(accepted)
+    except Exception:
+        # Titik ditahan yang ikut batch gagal ditahan lagi, disimpan saat batch dikirim ulang
+        compressor.rollback(checkpoint)
+        raise
+    
+    on_sensor_rows_committed(accepted, stored_rows, sensor_ids)
+    
+    positions = [index for index, is_fresh in enumerate(fresh) if is_fresh]
+    results = [None if is_fresh else DUPLICATE_READING for is_fresh in fresh]
+    for (_, index), sensor_id in zip(compressed, sensor_ids):
+        if index is not None:
+            results[positions[index]] = sensor_id
+    return results
+
+def flush_compressed_rows():
+    """Tulis titik yang masih ditahan ingest compression (saat shutdown)"""
+    rows = compressor.flush()
+    if not rows:
+        return
+    try:
+        device_ids = devices.resolve(row[0] for row in rows)
+        with get_db_connection() as conn:
+            insert_sensor_rows(conn, rows, device_ids, rollup_rows=[])
+            conn.commit()
+        logger.info(f"🗜️ Flushed {len(rows)} held compressed rows")
     except Exception as e:
-        logger.error(f"Error logging transaction: {e}")
-        # Jangan rollback transaksi utama jika logging gagal
-        pass
+        logger.error(f"Failed to flush held compressed rows: {e}")
+
+def write_with_breaker(rows):
+    """write_sensor_batch lewat circuit breaker (CircuitOpen jika database dianggap mati)"""
+    return db_breaker.call(write_sensor_batch, rows)
+
+def store_sensor_rows(rows):
+    """
+    Tulis data sensor ke database, atau ke spool lokal jika database tidak
+    tersedia (hasil SPOOLED_READING, di-replay otomatis saat database kembali).
+    """
+    if not rows:
+        return []
+    try:
+        return write_with_breaker(rows)
+    except CircuitOpen:
+        spool.append(rows)
+    except DB_UNAVAILABLE_ERRORS as e:
+        spool.append(rows)
+        logger.warning(f"📼 Database unavailable, {len(rows)} readings spooled: {e}")
+    
+    # Control loop cooling tidak menunggu database
+    process_cooling(rows)
+    return [SPOOLED_READING] * len(rows)
+
+spool = IngestSpool(
+    write_with_breaker,
+    retry_errors=(CircuitOpen,) + DB_UNAVAILABLE_ERRORS,
+    ready=db_breaker.available,
+    **SPOOL_CONFIG
+)
+ingest_buffer = IngestBuffer(store_sensor_rows, **INGEST_CONFIG)
 
 def hash_password(password: str) -> str:
     """Hash password menggunakan SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
 @app.post("/register-operator")
-async def register_operator(operator_data: OperatorRegistration):
+def register_operator(operator_data: OperatorRegistration):
     """Endpoint untuk registrasi operator baru"""
     try:
         with get_db_connection() as conn:
@@ -115,13 +384,13 @@ async def register_operator(operator_data: OperatorRegistration):
             
             operator_id = cursor.fetchone()[0]
             
-            # Log transaksi registrasi
-            log_transaction(conn, operator_id, f"Registrasi operator baru: {operator_data.name} ({operator_data.email})")
-            
             # Commit transaction
             conn.commit()
             cursor.close()
             
+            # Log transaksi registrasi
+            log_transaction(operator_id, f"Registrasi operator baru: {operator_data.name} ({operator_data.email})")
+            
             return {
                 "message": "Operator berhasil diregistrasi",
                 "operator_id": operator_id,
@@ -140,7 +409,7 @@ async def register_operator(operator_data: OperatorRegistration):
         raise HTTPException(status_code=500, detail=f"Error registrasi: {str(e)}")
 
 @app.post("/login")
-async def login_operator(login_data: OperatorLogin):
+def login_operator(login_data: OperatorLogin):
     """Endpoint untuk login operator"""
     try:
         with get_db_connection() as conn:
@@ -163,7 +432,7 @@ async def login_operator(login_data: OperatorLogin):
                 raise HTTPException(status_code=401, detail="Email atau password salah")
             
             # Log transaksi login
-            log_transaction(conn, operator['id'], f"Login operator: {operator['name']} ({operator['email']})")
+            log_transaction(operator['id'], f"Login operator: {operator['name']} ({operator['email']})")
             
             cursor.close()
             
@@ -184,7 +453,7 @@ async def login_operator(login_data: OperatorLogin):
         raise HTTPException(status_code=500, detail=f"Error login: {str(e)}")
 
 @app.get("/operators")
-async def get_operators():
+def get_operators():
     """Get semua operator yang terdaftar"""
     try:
         with get_db_connection() as conn:
@@ -205,7 +474,7 @@ async def get_operators():
         raise HTTPException(status_code=500, detail=f"Error fetching operators: {str(e)}")
 
 @app.get("/transactions")
-async def get_transactions(limit: int = 50):
+def get_transactions(limit: int = 50):
     """Get transaksi operator dari tabel transaksi_op"""
     try:
         with get_db_connection() as conn:
@@ -214,10 +483,11 @@ async def get_transactions(limit: int = 50):
             query = """
             SELECT t.id, t.tanggal, t.action, t.id_sensor,
                    o.name as operator_name, o.email as operator_email,
-                   s.nama_sensor
+                   d.nama_sensor
             FROM transaksi_op t
             LEFT JOIN op o ON t.id_op = o.id
             LEFT JOIN sensor s ON t.id_sensor = s.id
+            LEFT JOIN sensor_device d ON d.id = s.id_device
             ORDER BY t.tanggal DESC
             LIMIT %s
             """
@@ -236,103 +506,332 @@ async def get_transactions(limit: int = 50):
 
 @app.post("/sensor-data")
 async def create_sensor_data(sensor_data: SensorData):
+    # Tanggal sebagai DATE, waktu sebagai TIMESTAMP (timestamp device jika dikirim)
+    try:
+        row = build_sensor_row(sensor_data.nama_sensor, sensor_data.nilai, sensor_data.waktu, sensor_data.seq)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    current_date, current_time = row[1], row[3]
+    
+    try:
+        future = ingest_buffer.submit(row)
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Ingest queue penuh: {str(e)}")
+    
+    if ingest_buffer.durability == DURABILITY_ENQUEUE:
+        # Data sudah masuk antrian, akan ditulis oleh flusher
+        return {
+            "message": "Data sensor diterima",
+            "sensor_id": None,
+            "queued": True,
+            "tanggal": current_date.isoformat(),
+            "waktu": current_time.isoformat()
+        }
+    
+    try:
+        # Tunggu sampai batch berisi data ini di-commit
+        sensor_id = await asyncio.wrap_future(future)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving data: {str(e)}")
+    
+    if sensor_id == SPOOLED_READING:
+        # Database tidak tersedia, data aman di spool lokal dan ditulis saat database kembali
+        return {
+            "message": "Data sensor diterima (database tidak tersedia, disimpan di spool)",
+            "sensor_id": None,
+            "spooled": True,
+            "tanggal": current_date.isoformat(),
+            "waktu": current_time.isoformat()
+        }
+    
+    if sensor_id == DUPLICATE_READING:
+        # Dikirim ulang oleh device/gateway, data sudah tersimpan sebelumnya
+        return {
+            "message": "Data sensor sudah pernah diterima",
+            "sensor_id": None,
+            "duplicate": True,
+            "seq": sensor_data.seq,
+            "tanggal": current_date.isoformat(),
+            "waktu": current_time.isoformat()
+        }
+    
+    if sensor_id is None:
+        # Nilai dalam toleransi ingest compression, tidak disimpan sebagai baris baru
+        return {
+            "message": "Data sensor diterima (dikompresi)",
+            "sensor_id": None,
+            "stored": False,
+            "tanggal": current_date.isoformat(),
+            "waktu": current_time.isoformat()
+        }
+    
+    return {
+        "message": "Data sensor berhasil disimpan",
+        "sensor_id": sensor_id,
+        "tanggal": current_date.isoformat(),
+        "waktu": current_time.isoformat()
+    }
+
+@app.post("/sensor-data/batch")
+def create_sensor_data_batch(batch: SensorDataBatch):
+    """Endpoint untuk menyimpan banyak data sensor sekaligus (satu transaksi)"""
+    if len(batch.readings) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Maksimal {MAX_BATCH_SIZE} data per batch")
+    
+    results = []
+    rows = []
+    row_indexes = []
+    
+    # Validasi per baris, simpan error untuk baris yang tidak valid
+    for index, item in enumerate(batch.readings):
+        try:
+            reading = SensorReading.model_validate(item)
+        except ValidationError as e:
+            results.append({"index": index, "error": str(e.errors()[0]["msg"])})
+            continue
+        try:
+            rows.append(build_sensor_row(reading.nama_sensor, reading.nilai, reading.waktu, reading.seq))
+        except ValueError as e:
+            results.append({"index": index, "error": str(e)})
+            continue
+        row_indexes.append(index)
+    
+    if not rows:
+        # Semua baris tidak valid, tidak ada yang perlu ditulis
+        return {
+            "message": "Batch data sensor diproses",
+            "inserted": 0,
+            "compressed": 0,
+            "duplicates": 0,
+            "spooled": 0,
+            "failed": len(results),
+            "results": results
+        }
+    
+    try:
+        sensor_ids = store_sensor_rows(rows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving batch data: {str(e)}")
+    
+    for index, row, sensor_id in zip(row_indexes, rows, sensor_ids):
+        stored = isinstance(sensor_id, int)
+        results.append({
+            "index": index,
+            "sensor_id": sensor_id if stored else None,
+            "stored": stored,
+            "duplicate": sensor_id == DUPLICATE_READING,
+            "spooled": sensor_id == SPOOLED_READING,
+            "waktu": row[3].isoformat()
+        })
+    results.sort(key=lambda item: item["index"])
+    
+    return {
+        "message": "Batch data sensor diproses",
+        "inserted": sum(1 for sensor_id in sensor_ids if isinstance(sensor_id, int)),
+        "compressed": sensor_ids.count(None),
+        "duplicates": sensor_ids.count(DUPLICATE_READING),
+        "spooled": sensor_ids.count(SPOOLED_READING),
+        "failed": len(results) - len(sensor_ids),
+        "results": results
+    }
+
+@app.get("/sensor-data")
+def get_sensor_data(limit: Optional[int] = Query(None, ge=1), before: str = None, after: str = None, format: str = "json"):
+    """
+    Data sensor terbaru lebih dulu, dengan keyset pagination pada (waktu, id).
+    format=json mengembalikan satu halaman + cursor, format=ndjson/csv
+    men-stream seluruh hasil lewat server-side cursor.
+    """
+    try:
+        before_key = parse_cursor(before) if before else None
+        after_key = parse_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if format in ("ndjson", "csv"):
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(
+            iter_sensor_rows(limit, before_key, after_key, fmt=format),
+            media_type=media_type
+        )
+    if format != "json":
+        raise HTTPException(status_code=400, detail="Format harus json, ndjson atau csv")
+    
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Insert data sensor - tanggal sebagai DATE, waktu sebagai TIMESTAMP
-            query = """
-            INSERT INTO sensor (nama_sensor, tanggal, nilai, waktu)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id
-            """
-            
-            current_time = datetime.now()
-            # Gunakan hanya tanggal untuk kolom 'tanggal'
-            current_date = current_time.date()
-            
-            cursor.execute(query, (
-                sensor_data.nama_sensor,
-                current_date,  # Hanya tanggal (YYYY-MM-DD)
-                sensor_data.nilai,
-                current_time   # Waktu lengkap untuk kolom 'waktu'
-            ))
-            
-            sensor_id = cursor.fetchone()[0]
-            
-            # Log transaksi untuk sensor data (tanpa id_op karena dari ESP32)
-            log_transaction(conn, None, f"Data sensor {sensor_data.nama_sensor} dengan nilai {sensor_data.nilai} diterima dari ESP32", sensor_id)
-            
-            # Commit transaction
-            conn.commit()
-            cursor.close()
+            results, next_cursor, prev_cursor = fetch_sensor_page(conn, limit, before_key, after_key)
             
             return {
-                "message": "Data sensor berhasil disimpan",
-                "sensor_id": sensor_id,
-                "tanggal": current_date.isoformat(),
-                "waktu": current_time.isoformat()
+                "data": results,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
             
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error saving data: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
 
-@app.get("/sensor-data")
-async def get_sensor_data(limit: int = None):
+@app.get("/sensor-data/since")
+def get_sensor_data_since(id: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """
+    Delta-sync untuk dashboard: hanya data dengan id lebih besar dari `id`
+    terakhir yang dimiliki client, dalam payload kolumnar yang ringkas.
+    """
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            if limit and limit > 0:
-                query = """
-                SELECT id, nama_sensor, tanggal, nilai, waktu
-                FROM sensor
-                ORDER BY waktu DESC
-                LIMIT %s
-                """
-                cursor.execute(query, (limit,))
-            else:
-                # Jika tidak ada limit, ambil semua data
-                query = """
-                SELECT id, nama_sensor, tanggal, nilai, waktu
-                FROM sensor
-                ORDER BY waktu DESC
-                """
-                cursor.execute(query)
+            return fetch_sensor_delta(conn, id, limit)
             
-            results = cursor.fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching new data: {str(e)}")
+
+@app.get("/sensor-data/range")
+def get_sensor_data_range(
+    sensor: str,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(None, alias="to"),
+    points: int = None
+):
+    """
+    Data satu sensor pada rentang waktu, di-downsample di server dengan LTTB
+    menjadi paling banyak `points` titik (default 1000) berapapun panjang rentangnya.
+    Data lama yang sudah diarsipkan (cold tier) ikut digabung.
+    """
+    start = normalize_timestamp(start)
+    end = normalize_timestamp(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="Parameter 'to' harus lebih besar dari 'from'")
+    if points is not None and points <= 0:
+        raise HTTPException(status_code=400, detail="points harus lebih dari 0")
+    
+    try:
+        with get_db_connection() as conn:
+            return fetch_sensor_range(conn, sensor, start, end, points, archive=archiver.archive)
             
-            cursor.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching range data: {str(e)}")
+
+@app.get("/sensor-data/rollup")
+def get_sensor_data_rollup(
+    sensor: str,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(None, alias="to"),
+    points: int = None,
+    resolution: int = None
+):
+    """
+    Agregat satu sensor (jumlah/min/max/avg/stddev per bucket) pada rentang
+    waktu, dibaca dari rollup paling kasar yang memenuhi `resolution` (detik)
+    atau `points` (jumlah bucket, default 500).
+    """
+    start = normalize_timestamp(start)
+    end = normalize_timestamp(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="Parameter 'to' harus lebih besar dari 'from'")
+    if (points is not None and points <= 0) or (resolution is not None and resolution <= 0):
+        raise HTTPException(status_code=400, detail="points dan resolution harus lebih dari 0")
+    
+    try:
+        with get_db_connection() as conn:
+            return fetch_rollup_series(conn, sensor, start, end, resolution, points)
             
-            return {"data": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching rollup data: {str(e)}")
+
+@app.get("/stream")
+async def stream_live_updates():
+    """
+    Server-Sent Events: data sensor baru (event `readings`) dan perubahan
+    acuan baku (event `acuan_baku`) langsung dari ingest path
+    """
+    queue = broadcaster.subscribe()
+    return StreamingResponse(
+        broadcaster.stream(queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/stream/stats")
+async def get_stream_stats():
+    """Jumlah subscriber live update dan event yang dikirim/dibuang"""
+    return broadcaster.get_stats()
+
+@app.get("/ingest/stats")
+async def get_ingest_stats():
+    """Statistik ingest buffer (queue depth, ukuran batch, latency flush)"""
+    return ingest_buffer.get_stats()
+
+@app.get("/ingest/compression/stats")
+async def get_ingest_compression_stats():
+    """Statistik ingest compression (data diterima/disimpan dan rasio kompresi)"""
+    return compressor.get_stats()
+
+@app.get("/ingest/spool/stats")
+async def get_ingest_spool_stats():
+    """Status circuit breaker database dan spool lokal (ukuran, replay rate)"""
+    return {"breaker": db_breaker.get_stats(), "spool": spool.get_stats()}
+
+@app.get("/audit/stats")
+async def get_audit_stats():
+    """Statistik audit sink (antrian, event yang ditulis dan overflow)"""
+    return audit_sink.get_stats()
+
+@app.get("/sensors")
+def get_sensors():
+    """Daftar sensor yang terdaftar (dari tabel sensor_device, bukan scan tabel sensor)"""
+    try:
+        with get_db_connection() as conn:
+            sensors = fetch_devices(conn)
+        
+        return {
+            "sensors": sensors,
+            "total": len(sensors)
+        }
             
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching sensors: {str(e)}")
+
+@app.get("/sensors/stats")
+async def get_sensor_registry_stats():
+    """Statistik cache registry sensor (jumlah sensor, hit/miss)"""
+    return devices.get_stats()
+
+@app.get("/archive/stats")
+async def get_archive_stats():
+    """Statistik archiver data sensor lama (baris/hari yang diarsipkan)"""
+    return archiver.get_stats()
+
+@app.get("/partitions/stats")
+async def get_partition_stats():
+    """Statistik partition manager tabel sensor (partisi dibuat/dilepas, retensi)"""
+    return partitions.get_stats()
+
+@app.get("/acuan-baku/cache/stats")
+async def get_acuan_baku_cache_stats():
+    """Statistik cache acuan baku (versi, hit, reload, status listener)"""
+    return thresholds.get_stats()
+
+@app.get("/pool/stats")
+async def get_pool_stats():
+    """Statistik connection pool (in-use, idle, waktu tunggu, timeout)"""
+    return get_connection_stats() or {}
 
 @app.get("/acuan-baku")
-async def get_acuan_baku():
+def get_acuan_baku():
     """Get acuan baku (reference standards) for sensor values"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Get acuan baku data
-            query = "SELECT id, min, max, status FROM acuan_baku ORDER BY id"
-            cursor.execute(query)
-            acuan_data = cursor.fetchall()
-            
-            cursor.close()
-            
-            return {
-                "acuan_baku": acuan_data,
-                "message": "Acuan baku retrieved successfully"
-            }
+        # Dari cache; hanya query ke database setelah ada perubahan
+        acuan_data = thresholds.get()
+        
+        return {
+            "acuan_baku": acuan_data,
+            "version": thresholds.version,
+            "message": "Acuan baku retrieved successfully"
+        }
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching acuan baku: {str(e)}")
 
 @app.post("/acuan-baku")
-async def create_acuan_baku(acuan_data: AcuanBakuData):
+def create_acuan_baku(acuan_data: AcuanBakuData):
     """Create new acuan baku (reference standard)"""
     try:
         with get_db_connection() as conn:
@@ -357,10 +856,16 @@ async def create_acuan_baku(acuan_data: AcuanBakuData):
             
             acuan_id = cursor.fetchone()[0]
             
+            # Invalidate cache acuan baku di semua worker saat commit
+            notify_acuan_baku_changed(cursor, acuan_id)
+            
             # Commit transaction
             conn.commit()
             cursor.close()
             
+            thresholds.invalidate()
+            broadcaster.publish("acuan_baku", {"action": "create", "id": acuan_id})
+            
             return {
                 "message": "Acuan baku berhasil dibuat",
                 "acuan_id": acuan_id,
@@ -373,7 +878,7 @@ async def create_acuan_baku(acuan_data: AcuanBakuData):
         raise HTTPException(status_code=500, detail=f"Error creating acuan baku: {str(e)}")
 
 @app.put("/acuan-baku/{acuan_id}")
-async def update_acuan_baku(acuan_id: int, acuan_data: AcuanBakuUpdate):
+def update_acuan_baku(acuan_id: int, acuan_data: AcuanBakuUpdate):
     """Update existing acuan baku (reference standard)"""
     try:
         with get_db_connection() as conn:
@@ -406,10 +911,16 @@ async def update_acuan_baku(acuan_id: int, acuan_data: AcuanBakuUpdate):
             
             updated_data = cursor.fetchone()
             
+            # Invalidate cache acuan baku di semua worker saat commit
+            notify_acuan_baku_changed(cursor, acuan_id)
+            
             # Commit transaction
             conn.commit()
             cursor.close()
             
+            thresholds.invalidate()
+            broadcaster.publish("acuan_baku", {"action": "update", "id": acuan_id})
+            
             return {
                 "message": "Acuan baku berhasil diupdate",
                 "acuan_id": updated_data[0],
@@ -422,7 +933,7 @@ async def update_acuan_baku(acuan_id: int, acuan_data: AcuanBakuUpdate):
         raise HTTPException(status_code=500, detail=f"Error updating acuan baku: {str(e)}")
 
 @app.delete("/acuan-baku/{acuan_id}")
-async def delete_acuan_baku(acuan_id: int):
+def delete_acuan_baku(acuan_id: int):
     """Delete acuan baku (reference standard)"""
     try:
         with get_db_connection() as conn:
@@ -438,10 +949,16 @@ async def delete_acuan_baku(acuan_id: int):
             delete_query = "DELETE FROM acuan_baku WHERE id = %s"
             cursor.execute(delete_query, (acuan_id,))
             
+            # Invalidate cache acuan baku di semua worker saat commit
+            notify_acuan_baku_changed(cursor, acuan_id)
+            
             # Commit transaction
             conn.commit()
             cursor.close()
             
+            thresholds.invalidate()
+            broadcaster.publish("acuan_baku", {"action": "delete", "id": acuan_id})
+            
             return {
                 "message": f"Acuan baku ID {acuan_id} berhasil dihapus"
             }
@@ -450,152 +967,154 @@ async def delete_acuan_baku(acuan_id: int):
         raise HTTPException(status_code=500, detail=f"Error deleting acuan baku: {str(e)}")
 
 @app.get("/sensor-status/{sensor_name}")
-async def get_sensor_status(sensor_name: str):
+def get_sensor_status(sensor_name: str):
     """Get current status of a specific sensor based on acuan baku"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Get latest sensor value
-            sensor_query = """
-            SELECT nilai, waktu 
-            FROM sensor 
-            WHERE nama_sensor = %s 
-            ORDER BY waktu DESC 
-            LIMIT 1
-            """
-            cursor.execute(sensor_query, (sensor_name,))
-            sensor_data = cursor.fetchone()
-            
-            if not sensor_data:
-                raise HTTPException(status_code=404, detail=f"Sensor {sensor_name} not found")
-            
-            # Get acuan baku
-            acuan_query = "SELECT min, max, status FROM acuan_baku ORDER BY id"
-            cursor.execute(acuan_query)
-            acuan_data = cursor.fetchall()
-            
-            # Determine status based on acuan baku
-            current_value = sensor_data['nilai']
-            status = "Normal"
-            alert_level = "info"
-            
-            for acuan in acuan_data:
-                min_val = acuan['min']
-                max_val = acuan['max']
-                
-                if current_value < min_val:
-                    status = "BAHAYA - Nilai Terlalu Rendah"
-                    alert_level = "danger"
-                    break
-                elif current_value > max_val:
-                    status = "BAHAYA - Nilai Terlalu Tinggi"
-                    alert_level = "danger"
-                    break
-                elif min_val <= current_value <= max_val:
-                    status = "Normal"
-                    alert_level = "success"
-                    break
-            
-            cursor.close()
-            
-            return {
-                "sensor_name": sensor_name,
-                "current_value": current_value,
-                "timestamp": sensor_data['waktu'],
-                "status": status,
-                "alert_level": alert_level,
-                "acuan_baku": acuan_data
-            }
+        # Get latest sensor value (dari latest-value store jika sudah siap)
+        if LATEST_VALUES_ENABLED and latest_values.ready:
+            sensor_data = latest_values.get(sensor_name)
+        else:
+            with get_db_connection() as conn:
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                sensor_query = """
+                SELECT s.nilai, s.waktu 
+                FROM sensor s
+                JOIN sensor_device d ON d.id = s.id_device
+                WHERE d.nama_sensor = %s 
+                ORDER BY s.waktu DESC 
+                LIMIT 1
+                """
+                cursor.execute(sensor_query, (sensor_name,))
+                sensor_data = cursor.fetchone()
+                cursor.close()
+        
+        if not sensor_data:
+            raise HTTPException(status_code=404, detail=f"Sensor {sensor_name} not found")
+        
+        # Get acuan baku (dari cache, sudah dikompilasi menjadi interval index)
+        engine = thresholds.get_engine()
+        acuan_data = [
+            {"min": acuan['min'], "max": acuan['max'], "status": acuan['status']}
+            for acuan in engine.rows
+        ]
+        
+        # Determine status based on acuan baku (O(log bands))
+        current_value = sensor_data['nilai']
+        classification = engine.classify(sensor_name, current_value)
+        status = classification.status
+        alert_level = classification.alert_level
+        
+        return {
+            "sensor_name": sensor_name,
+            "current_value": current_value,
+            "timestamp": sensor_data['waktu'],
+            "status": status,
+            "alert_level": alert_level,
+            "acuan_baku": acuan_data
+        }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking sensor status: {str(e)}")
 
 @app.get("/sensor-stats")
-async def get_sensor_stats():
+def get_sensor_stats():
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Get total count
-            count_query = "SELECT COUNT(*) as total FROM sensor"
-            cursor.execute(count_query)
-            total_count = cursor.fetchone()['total']
-            
-            # Get today's count
-            today_query = """
-            SELECT COUNT(*) as today_count 
-            FROM sensor 
-            WHERE tanggal = CURRENT_DATE
-            """
-            cursor.execute(today_query)
-            today_count = cursor.fetchone()['today_count']
-            
-            # Get unique sensor names
-            sensor_query = "SELECT DISTINCT nama_sensor FROM sensor"
-            cursor.execute(sensor_query)
-            unique_sensors = [row['nama_sensor'] for row in cursor.fetchall()]
-            
-            # Get latest data for chart
-            latest_query = """
-            SELECT id, nama_sensor, tanggal, nilai, waktu
-            FROM sensor
-            ORDER BY waktu DESC
-            LIMIT 50
-            """
-            cursor.execute(latest_query)
-            latest_data = cursor.fetchall()
-            
-            # Get acuan baku for status checking
-            acuan_query = "SELECT min, max, status FROM acuan_baku ORDER BY id"
-            cursor.execute(acuan_query)
-            acuan_data = cursor.fetchall()
-            
-            # Check overall system status based on latest values
-            system_status = "Normal"
-            alert_count = 0
-            
-            for sensor_name in unique_sensors:
-                # Get latest value for each sensor
-                latest_sensor_query = """
-                SELECT nilai FROM sensor 
-                WHERE nama_sensor = %s 
-                ORDER BY waktu DESC 
-                LIMIT 1
-                """
-                cursor.execute(latest_sensor_query, (sensor_name,))
-                latest_value = cursor.fetchone()
-                
-                if latest_value:
-                    current_value = latest_value['nilai']
-                    # Check against acuan baku
-                    for acuan in acuan_data:
-                        if current_value < acuan['min'] or current_value > acuan['max']:
-                            alert_count += 1
-                            system_status = "Waspada"
-                            break
+            # Satu round trip: counter, nilai terbaru per sensor, data chart.
+            # Nilai terbaru per sensor dari latest-value store jika sudah siap, acuan baku dari cache
+            use_store = LATEST_VALUES_ENABLED and latest_values.ready
+            stats = fetch_sensor_stats(conn, include_latest_values=not use_store)
+            
+            current_values = latest_values.snapshot() if use_store else stats['latest_values']
+            unique_sensors = [row['nama_sensor'] for row in current_values]
+            engine = thresholds.get_engine(conn)
+            acuan_data = engine.rows
+            
+            # Check overall system status based on latest values (satu batch classify)
+            classifications = engine.classify_many(
+                [(row['nama_sensor'], row['nilai']) for row in current_values]
+            )
+            alert_count = sum(1 for item in classifications if item.severity > SEVERITY_NORMAL)
+            system_status = "Waspada" if alert_count else "Normal"
             
             if alert_count > 2:
                 system_status = "Bahaya"
             
-            cursor.close()
-            
             return {
                 "total_sensors": len(unique_sensors),
-                "total_data": total_count,
-                "today_data": today_count,
+                "total_data": stats['total'],
+                "today_data": stats['today_count'],
                 "sensor_names": unique_sensors,
-                "latest_data": latest_data,
+                "latest_data": stats['latest_data'],
                 "system_status": system_status,
                 "alert_count": alert_count,
-                "acuan_baku": acuan_data
+                "acuan_baku": [
+                    {"min": acuan['min'], "max": acuan['max'], "status": acuan['status']}
+                    for acuan in acuan_data
+                ]
             }
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
 
+@app.get("/alerts")
+def get_alerts(limit: int = 50, sensor: str = None):
+    """Event perubahan state alert (dari alert engine di ingest path) dan state terkini per sensor"""
+    try:
+        with get_db_connection() as conn:
+            events = fetch_alert_events(conn, limit, sensor)
+        
+        states = alert_engine.current_states()
+        if sensor:
+            states = [state for state in states if state['nama_sensor'] == sensor]
+        
+        return {
+            "alerts": events,
+            "total": len(events),
+            "current": states
+        }
+            
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching alerts: {str(e)}")
+
+@app.get("/cooling")
+def get_cooling_state():
+    """State sistem pendingin saat ini (dikontrol server)"""
+    return cooling.get_state()
+
+@app.post("/cooling")
+def set_cooling_state(command: CoolingCommand):
+    """Ubah mode cooling (auto/manual) atau nyalakan/matikan secara manual"""
+    try:
+        state = cooling.set_manual(command.mode, command.is_on, command.id_op)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    persist_cooling_state(state)
+    if command.id_op:
+        log_transaction(command.id_op, f"Cooling system {'ON' if state['is_on'] else 'OFF'} (mode {state['mode']})")
+    
+    return {"message": "State cooling berhasil diubah", "cooling": cooling.get_state()}
+
+@app.get("/cooling/history")
+def get_cooling_history(limit: int = 50):
+    """Riwayat perubahan state cooling"""
+    try:
+        with get_db_connection() as conn:
+            history = fetch_cooling_history(conn, limit)
+        
+        return {
+            "history": history,
+            "total": len(history)
+        }
+            
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching cooling history: {str(e)}")
+
 @app.get("/debug/sensor-data")
-async def debug_sensor_data():
+def debug_sensor_data():
     """Endpoint untuk debugging - tampilkan data mentah dari database"""
     try:
         with get_db_connection() as conn:
@@ -603,9 +1122,10 @@ async def debug_sensor_data():
             
             # Get sample data untuk debugging
             query = """
-            SELECT id, nama_sensor, tanggal, nilai, waktu
-            FROM sensor
-            ORDER BY waktu DESC
+            SELECT s.id, d.nama_sensor, s.tanggal, s.nilai, s.waktu
+            FROM sensor s
+            JOIN sensor_device d ON d.id = s.id_device
+            ORDER BY s.waktu DESC
             LIMIT 10
             """
             cursor.execute(query)
@@ -637,7 +1157,7 @@ async def debug_sensor_data():
         }
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint to verify database connectivity"""
     try:
         with get_db_connection() as conn:
@@ -649,6 +1169,7 @@ async def health_check():
         return {
             "status": "healthy",
             "database": "connected",
+            "pool": get_connection_stats(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Antrian data sensor di disk (SQLite) untuk edge gateway
+
+Setiap data yang diterima langsung di-commit ke file SQLite (mode WAL),
+sehingga tidak hilang walaupun koneksi WAN putus atau gateway restart.
+Gateway memberi nomor urut (seq) per sensor yang dipakai server pusat untuk
+dedupe saat batch dikirim ulang. Seq dimulai dari epoch dalam milidetik
+agar tetap naik walaupun file antrian dihapus/dibuat ulang. Waktu disimpan
+dalam UTC dengan offset eksplisit, sehingga server pusat tidak perlu
+berada di timezone yang sama dengan gateway.
+"""
+
+from datetime import datetime, timezone
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Disk queue configuration (bisa diubah lewat environment variable)
+QUEUE_CONFIG = {
+    "path": os.getenv(
+        "GATEWAY_QUEUE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "queue.db")
+    ),
+    # Batas jumlah data di antrian; data baru ditolak (HTTP 503) jika penuh
+    "max_rows": int(os.getenv("GATEWAY_QUEUE_MAX_ROWS", "5000000")),
+    # NORMAL: aman jika proses crash, FULL: juga aman jika listrik mati
+    "synchronous": os.getenv("GATEWAY_QUEUE_SYNC", "NORMAL"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama_sensor TEXT NOT NULL,
+    nilai REAL NOT NULL,
+    waktu TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sensor_seq (
+    nama_sensor TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead_letter (
+    id INTEGER PRIMARY KEY,
+    nama_sensor TEXT NOT NULL,
+    nilai REAL NOT NULL,
+    waktu TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    reason TEXT,
+    failed_at TEXT NOT NULL
+);
+"""
+
+class DiskQueueFull(Exception):
+    """Antrian disk sudah mencapai max_rows"""
+
+class DiskQueue:
+    """Antrian FIFO di SQLite yang thread-safe (satu koneksi, dijaga lock)"""
+
+    def __init__(self, path, max_rows=5000000, synchronous="NORMAL"):
+        if synchronous not in ("NORMAL", "FULL"):
+            raise ValueError(f"Unknown synchronous mode: {synchronous}")
+
+        self.path = path
+        self.max_rows = max_rows
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        self._depth = self._conn.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+        self._stats = {"accepted": 0, "rejected": 0, "acked": 0, "dead": 0}
+        if self._depth:
+            logger.info(f"📥 Disk queue {path}: {self._depth} readings pending from previous run")
+
+    def put(self, nama_sensor, nilai, waktu=None):
+        """Simpan satu data. Mengembalikan (seq, waktu UTC) yang diberikan gateway."""
+        # Waktu tanpa timezone dari device dianggap jam lokal gateway
+        waktu = waktu.astimezone(timezone.utc) if waktu else datetime.now(timezone.utc)
+        with self._lock:
+            if self._depth >= self.max_rows:
+                self._stats["rejected"] += 1
+                raise DiskQueueFull(f"Disk queue full ({self.max_rows} readings)")
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT seq FROM sensor_seq WHERE nama_sensor = ?", (nama_sensor,)
+                ).fetchone()
+                seq = row[0] + 1 if row else int(time.time() * 1000)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sensor_seq (nama_sensor, seq) VALUES (?, ?)",
+                    (nama_sensor, seq)
+                )
+                self._conn.execute(
+                    "INSERT INTO readings (nama_sensor, nilai, waktu, seq) VALUES (?, ?, ?, ?)",
+                    (nama_sensor, nilai, waktu.isoformat(), seq)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._depth += 1
+            self._stats["accepted"] += 1
+        return seq, waktu
+
+    def peek(self, limit):
+        """Data tertua (id, nama_sensor, nilai, waktu, seq) tanpa menghapusnya"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, nama_sensor, nilai, waktu, seq FROM readings ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+    def ack(self, last_id, rejected=None):
+        """
+        Hapus semua data sampai last_id (sudah diterima server pusat).
+        rejected: dict id -> alasan untuk data yang ditolak per baris oleh
+        server; data tersebut dipindah ke dead_letter, bukan dihapus.
+        """
+        rejected = rejected or {}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                failed_at = datetime.now(timezone.utc).isoformat()
+                for row_id, reason in rejected.items():
+                    self._conn.execute("""
+                    INSERT OR REPLACE INTO dead_letter (id, nama_sensor, nilai, waktu, seq, reason, failed_at)
+                    SELECT id, nama_sensor, nilai, waktu, seq, ?, ? FROM readings WHERE id = ?
+                    """, (reason, failed_at, row_id))
+                deleted = self._conn.execute("DELETE FROM readings WHERE id <= ?", (last_id,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= deleted
+            self._stats["acked"] += deleted - len(rejected)
+            self._stats["dead"] += len(rejected)
+        return deleted
+
+    def dead_letter(self, last_id, reason):
+        """Pindahkan data sampai last_id ke tabel dead_letter (ditolak permanen oleh server)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("""
+                INSERT OR REPLACE INTO dead_letter (id, nama_sensor, nilai, waktu, seq, reason, failed_at)
+                SELECT id, nama_sensor, nilai, waktu, seq, ?, ? FROM readings WHERE id <= ?
+                """, (reason, datetime.now(timezone.utc).isoformat(), last_id))
+                moved = self._conn.execute("DELETE FROM readings WHERE id <= ?", (last_id,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= moved
+            self._stats["dead"] += moved
+        return moved
+
+    def depth(self):
+        with self._lock:
+            return self._depth
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["depth"] = self._depth
+            oldest = self._conn.execute("SELECT MIN(waktu) FROM readings").fetchone()[0]
+        stats.update({
+            "max_rows": self.max_rows,
+            "oldest": oldest,
+            "path": self.path,
+        })
+        return stats
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Forwarder: kirim isi disk queue ke server pusat dalam batch terkompresi
+
+Batch dikirim sebagai JSON + gzip ke POST /sensor-data/batch. Data baru
+dihapus dari antrian setelah server membalas 2xx; jika gagal (WAN putus,
+server down) batch yang sama dikirim ulang dengan exponential backoff.
+Server pusat melakukan dedupe per (sensor, seq), jadi pengiriman ulang aman.
+"""
+
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+# Forwarder configuration (bisa diubah lewat environment variable)
+FORWARDER_CONFIG = {
+    "upstream_url": os.getenv("GATEWAY_UPSTREAM_URL", "http://localhost:8000"),
+    "flush_interval": float(os.getenv("GATEWAY_FLUSH_INTERVAL_S", "5")),
+    # Maksimal 5000 (MAX_BATCH_SIZE di server pusat)
+    "max_batch": int(os.getenv("GATEWAY_MAX_BATCH", "1000")),
+    "timeout": float(os.getenv("GATEWAY_UPSTREAM_TIMEOUT_S", "30")),
+    "backoff_base": float(os.getenv("GATEWAY_BACKOFF_BASE_S", "1")),
+    "backoff_max": float(os.getenv("GATEWAY_BACKOFF_MAX_S", "300")),
+}
+
+# Status HTTP yang tetap dicoba ulang; 4xx lainnya berarti batch ditolak permanen
+RETRYABLE_STATUS = {408, 425, 429}
+
+class UpstreamRejected(Exception):
+    """Server pusat menolak batch secara permanen (4xx)"""
+
+class Forwarder:
+    """Thread yang mengirim antrian ke server pusat"""
+
+    def __init__(self, queue, upstream_url, flush_interval=5.0, max_batch=1000,
+                 timeout=30.0, backoff_base=1.0, backoff_max=300.0):
+        self.queue = queue
+        self.url = upstream_url.rstrip("/") + "/sensor-data/batch"
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._stats = {
+            "sent_batches": 0,
+            "sent_rows": 0,
+            "sent_bytes": 0,
+            "rejected_rows": 0,
+            "duplicate_rows": 0,
+            "failed_attempts": 0,
+            "last_error": None,
+            "last_success": None,
+            "last_send_ms": 0.0,
+        }
+
+    def _post(self, rows):
+        """Kirim satu batch, mengembalikan response JSON dari server pusat"""
+        readings = [
+            {"nama_sensor": nama_sensor, "nilai": nilai, "waktu": waktu, "seq": seq}
+            for _, nama_sensor, nilai, waktu, seq in rows
+        ]
+        body = gzip.compress(json.dumps({"readings": readings}, separators=(",", ":")).encode("utf-8"))
+        request = urllib.request.Request(self.url, data=body, method="POST", headers={
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                result = json.loads(response.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500 and e.code not in RETRYABLE_STATUS:
+                raise UpstreamRejected(f"HTTP {e.code}: {e.read()[:200]!r}") from e
+            raise
+
+        with self._lock:
+            self._stats["sent_bytes"] += len(body)
+        return result
+
+    def send_once(self):
+        """
+        Kirim satu batch dari antrian. Mengembalikan jumlah data yang terkirim
+        (0 jika antrian kosong); exception jika gagal.
+        """
+        rows = self.queue.peek(self.max_batch)
+        if not rows:
+            return 0
+
+        started = time.monotonic()
+        last_id = rows[-1][0]
+        try:
+            result = self._post(rows)
+        except UpstreamRejected as e:
+            # Dikirim ulang pun akan tetap ditolak, pindahkan agar antrian tidak macet
+            moved = self.queue.dead_letter(last_id, str(e))
+            logger.error(f"Upstream rejected batch, {moved} readings moved to dead letter: {e}")
+            with self._lock:
+                self._stats["rejected_rows"] += moved
+                self._stats["last_error"] = str(e)
+            return moved
+
+        # Data yang ditolak per baris (mis. timestamp tidak valid) disimpan di dead letter
+        errors = [item for item in result.get("results", []) if "error" in item]
+        self.queue.ack(last_id, {rows[item["index"]][0]: item["error"] for item in errors})
+        if errors:
+            logger.warning(f"Upstream rejected {len(errors)} readings, moved to dead letter: {errors[0]['error']}")
+
+        with self._lock:
+            self._stats["sent_batches"] += 1
+            self._stats["sent_rows"] += len(rows)
+            self._stats["rejected_rows"] += len(errors)
+            self._stats["duplicate_rows"] += result.get("duplicates", 0)
+            self._stats["last_success"] = time.time()
+            self._stats["last_send_ms"] = (time.monotonic() - started) * 1000
+        return len(rows)
+
+    def backoff_delay(self):
+        """Exponential backoff dengan full jitter berdasarkan jumlah gagal berturut-turut"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** self._failures))
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gateway-forwarder", daemon=True)
+        self._thread.start()
+        logger.info(f"Forwarder started (upstream={self.url}, max_batch={self.max_batch})")
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sent = self.send_once()
+            except Exception as e:
+                self._failures += 1
+                delay = self.backoff_delay()
+                with self._lock:
+                    self._stats["failed_attempts"] += 1
+                    self._stats["last_error"] = str(e)
+                logger.warning(f"Forward failed ({self._failures}x), retry in {delay:.1f}s: {e}")
+                self._stop.wait(delay)
+                continue
+
+            self._failures = 0
+            # Batch penuh berarti masih ada antrian, langsung kirim berikutnya
+            if sent < self.max_batch:
+                self._stop.wait(self.flush_interval)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "upstream_url": self.url,
+            "consecutive_failures": self._failures,
+            "max_batch": self.max_batch,
+            "running": bool(self._thread and self._thread.is_alive()),
+        })
+        return stats
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Edge gateway untuk banyak ESP32 dalam satu site
+
+ESP32 mengirim ke gateway dengan format yang sama seperti POST /sensor-data
+di server pusat (cukup ganti serverUrl di sketch). Gateway menyimpan data
+ke antrian disk dan meneruskannya ke server pusat dalam batch gzip, sehingga
+data tidak hilang saat WAN putus dan server pusat hanya menerima sedikit
+request besar. Dijalankan sebagai package dari root repository:
+
+    GATEWAY_UPSTREAM_URL=http://server-pusat:8000 python -m gateway.main
+"""
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+import uvicorn
+
+from .disk_queue import QUEUE_CONFIG, DiskQueue, DiskQueueFull
+from .forwarder import FORWARDER_CONFIG, Forwarder
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Sensor Edge Gateway")
+
+disk_queue = DiskQueue(**QUEUE_CONFIG)
+forwarder = Forwarder(disk_queue, **FORWARDER_CONFIG)
+
+class SensorData(BaseModel):
+    nama_sensor: str
+    nilai: float
+    waktu: Optional[datetime] = None  # Default: jam gateway saat data diterima (tanpa timezone = jam lokal gateway)
+
+@app.on_event("startup")
+async def startup_event():
+    forwarder.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Kirim sisa antrian sekali lagi sebelum berhenti (sisanya tetap di disk)"""
+    await asyncio.get_running_loop().run_in_executor(None, forwarder.stop)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, forwarder.send_once)
+    except Exception as e:
+        logger.warning(f"Final forward failed, {disk_queue.depth()} readings kept on disk: {e}")
+    disk_queue.close()
+
+@app.post("/sensor-data")
+def create_sensor_data(sensor_data: SensorData):
+    """Terima data dari ESP32 dan simpan ke antrian disk"""
+    try:
+        seq, waktu = disk_queue.put(sensor_data.nama_sensor, sensor_data.nilai, sensor_data.waktu)
+    except DiskQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Antrian gateway penuh: {str(e)}")
+
+    return {
+        "message": "Data sensor diterima gateway",
+        "sensor_id": None,
+        "queued": True,
+        "seq": seq,
+        "tanggal": waktu.astimezone().date().isoformat(),
+        "waktu": waktu.isoformat()
+    }
+
+@app.get("/stats")
+def get_gateway_stats():
+    """Statistik antrian disk dan pengiriman ke server pusat"""
+    return {"queue": disk_queue.get_stats(), "forwarder": forwarder.get_stats()}
+
+@app.get("/health")
+def health_check():
+    stats = forwarder.get_stats()
+    return {
+        "status": "healthy" if stats["consecutive_failures"] == 0 else "degraded",
+        "queue_depth": disk_queue.depth(),
+        "last_error": stats["last_error"],
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/")
+async def root():
+    return {"message": "Sensor Edge Gateway"}
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("GATEWAY_PORT", "8001")))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Write-behind buffer untuk ingest data sensor (group commit)
+
+Request hanya memasukkan data ke antrian, lalu satu thread flusher menulis
+data ke database dalam batch berdasarkan waktu atau jumlah baris.
+"""
+
+from concurrent.futures import Future
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Mode durability:
+#   "flush"   -> response dikirim setelah batch berhasil di-commit
+#   "enqueue" -> response dikirim langsung setelah data masuk antrian
+DURABILITY_FLUSH = "flush"
+DURABILITY_ENQUEUE = "enqueue"
+
+# Ingest buffer configuration (bisa diubah lewat environment variable)
+INGEST_CONFIG = {
+    "flush_interval": float(os.getenv("INGEST_FLUSH_INTERVAL_MS", "50")) / 1000,
+    "max_batch": int(os.getenv("INGEST_MAX_BATCH", "1000")),
+    "max_queue": int(os.getenv("INGEST_MAX_QUEUE", "100000")),
+    "durability": os.getenv("INGEST_DURABILITY", DURABILITY_FLUSH),
+}
+
+_STOP = object()
+
+class IngestQueueFull(Exception):
+    """Antrian ingest penuh, data tidak bisa diterima"""
+
+class IngestBuffer:
+    """Antrian in-process dengan satu thread flusher yang menulis secara batch"""
+
+    def __init__(self, write_batch, flush_interval=0.05, max_batch=1000,
+                 max_queue=100000, durability=DURABILITY_FLUSH):
+        if durability not in (DURABILITY_FLUSH, DURABILITY_ENQUEUE):
+            raise ValueError(f"Unknown ingest durability mode: {durability}")
+
+        self.write_batch = write_batch
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.durability = durability
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "accepted_rows": 0,
+            "rejected_rows": 0,
+            "flushed_rows": 0,
+            "flushed_batches": 0,
+            "failed_rows": 0,
+            "last_flush_ms": 0.0,
+            "last_batch_size": 0,
+        }
+
+    def start(self):
+        """Jalankan thread flusher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+        logger.info(f"Ingest buffer started (durability={self.durability}, "
+                    f"flush_interval={self.flush_interval * 1000:.0f}ms, max_batch={self.max_batch})")
+
+    def stop(self, timeout=10.0):
+        """Hentikan flusher setelah semua data di antrian ditulis"""
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Ingest buffer did not drain in {timeout}s, {self._queue.qsize()} rows left")
+        else:
+            logger.info("Ingest buffer drained and stopped")
+        self._thread = None
+
+    def submit(self, row):
+        """
+        Masukkan satu baris ke antrian. Mengembalikan Future yang berisi
+        sensor id setelah batch-nya di-commit.
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((row, future))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected_rows"] += 1
+            raise IngestQueueFull(f"Ingest queue full ({self._queue.maxsize} rows)")
+
+        with self._stats_lock:
+            self._stats["accepted_rows"] += 1
+        return future
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def get_stats(self):
+        """Statistik buffer untuk monitoring"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "durability": self.durability,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "max_batch": self.max_batch,
+            "running": bool(self._thread and self._thread.is_alive()),
+        })
+        return stats
+
+    def _collect_batch(self, first_item):
+        """Kumpulkan item sampai max_batch atau flush_interval habis"""
+        batch = [first_item]
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+
+        return batch, stopping
+
+    def _flush(self, batch):
+        rows = [row for row, _ in batch]
+        futures = [future for _, future in batch]
+        started = time.monotonic()
+
+        try:
+            sensor_ids = self.write_batch(rows)
+        except Exception as e:
+            logger.error(f"Ingest flush failed for {len(rows)} rows: {e}")
+            with self._stats_lock:
+                self._stats["failed_rows"] += len(rows)
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        with self._stats_lock:
+            self._stats["flushed_rows"] += len(rows)
+            self._stats["flushed_batches"] += 1
+            self._stats["last_flush_ms"] = (time.monotonic() - started) * 1000
+            self._stats["last_batch_size"] = len(rows)
+
+        for future, sensor_id in zip(futures, sensor_ids):
+            future.set_result(sensor_id)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect_batch(item)
+            self._flush(batch)
+
+        # Drain sisa antrian sebelum berhenti
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.max_batch):
+            self._flush(remaining[start:start + self.max_batch])
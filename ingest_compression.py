@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Kompresi data sensor di ingest path (deadband / swinging door)
+
+Titik yang bisa direkonstruksi dari titik tersimpan (dalam batas toleransi)
+tidak ditulis ke database:
+- deadband: simpan jika nilai berubah lebih dari toleransi dari nilai
+  terakhir yang disimpan
+- swinging door: simpan titik sudut; titik di antaranya bisa direkonstruksi
+  dengan interpolasi linear antar titik tersimpan (error <= toleransi).
+  Titik terakhir ditahan di memori sampai "pintu" tertutup.
+Heartbeat: setidaknya satu titik disimpan setiap `max_interval` detik.
+Data terlambat (lebih tua dari titik terakhir sensor) selalu disimpan.
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_OFF = "off"
+COMPRESSION_DEADBAND = "deadband"
+COMPRESSION_SWINGING_DOOR = "swinging_door"
+
+def parse_tolerances(value):
+    """Parse "nama:toleransi,nama2:toleransi" menjadi dict"""
+    tolerances = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, _, tolerance = item.rpartition(":")
+        tolerances[name] = float(tolerance)
+    return tolerances
+
+# Ingest compression configuration (bisa diubah lewat environment variable)
+COMPRESSION_CONFIG = {
+    "mode": os.getenv("INGEST_COMPRESSION", COMPRESSION_OFF),
+    "tolerance": float(os.getenv("INGEST_COMPRESSION_TOLERANCE", "0.5")),
+    "max_interval": float(os.getenv("INGEST_COMPRESSION_MAX_INTERVAL_S", "300")),
+    # Toleransi per sensor, contoh: "suhu_ruang:0.2,suhu_gudang:1"
+    "sensor_tolerances": parse_tolerances(os.getenv("INGEST_COMPRESSION_SENSORS")),
+}
+
+class _SensorState:
+    __slots__ = ("stored", "held", "slope_low", "slope_high", "last_time")
+
+    def __init__(self, row):
+        self.stored = row       # Titik terakhir yang disimpan
+        self.held = None        # Titik terakhir yang belum disimpan (swinging door)
+        self.slope_low = float("-inf")
+        self.slope_high = float("inf")
+        self.last_time = row[3]
+
+    def copy(self):
+        state = _SensorState(self.stored)
+        state.held = self.held
+        state.slope_low = self.slope_low
+        state.slope_high = self.slope_high
+        state.last_time = self.last_time
+        return state
+
+class IngestCompressor:
+    """State kompresi per sensor (thread-safe)"""
+
+    def __init__(self, mode=COMPRESSION_OFF, tolerance=0.5, max_interval=300.0, sensor_tolerances=None):
+        if mode not in (COMPRESSION_OFF, COMPRESSION_DEADBAND, COMPRESSION_SWINGING_DOOR):
+            raise ValueError(f"Unknown ingest compression mode: {mode}")
+
+        self.mode = mode
+        self.tolerance = tolerance
+        self.max_interval = max_interval
+        self.sensor_tolerances = sensor_tolerances or {}
+
+        self._states = {}
+        self._lock = threading.Lock()
+        self._stats = {"received": 0, "stored": 0, "dropped": 0}
+
+    @property
+    def enabled(self):
+        return self.mode != COMPRESSION_OFF
+
+    def _store(self, state, row):
+        state.stored = row
+        state.held = None
+        state.slope_low = float("-inf")
+        state.slope_high = float("inf")
+
+    def _offer(self, state, row, tolerance):
+        """Proses satu titik; mengembalikan list baris yang harus disimpan"""
+        stored = state.stored
+        elapsed = (row[3] - stored[3]).total_seconds()
+        output = []
+
+        if self.mode == COMPRESSION_DEADBAND:
+            if abs(row[2] - stored[2]) > tolerance or elapsed >= self.max_interval:
+                self._store(state, row)
+                output.append(row)
+            return output
+
+        if elapsed <= 0:
+            # Timestamp sama dengan titik tersimpan (tidak ada titik ditahan):
+            # slope tidak terdefinisi, pakai deadband agar lonjakan tidak hilang
+            if abs(row[2] - stored[2]) > tolerance:
+                self._store(state, row)
+                output.append(row)
+            return output
+
+        # Swinging door: titik ini bisa jadi ujung segmen jika garis dari titik
+        # tersimpan ke titik ini masih di dalam pintu titik-titik sebelumnya
+        slope = (row[2] - stored[2]) / elapsed
+        if not state.slope_low <= slope <= state.slope_high:
+            # Pintu tertutup: titik yang ditahan menjadi titik sudut
+            pivot = state.held
+            self._store(state, pivot)
+            output.append(pivot)
+            return output + self._offer(state, row, tolerance)
+
+        state.slope_low = max(state.slope_low, (row[2] - tolerance - stored[2]) / elapsed)
+        state.slope_high = min(state.slope_high, (row[2] + tolerance - stored[2]) / elapsed)
+        state.held = row
+        if elapsed >= self.max_interval:
+            self._store(state, row)
+            output.append(row)
+        return output
+
+    def process(self, rows):
+        """
+        Baris sensor (nama_sensor, tanggal, nilai, waktu) -> list baris yang
+        disimpan, sebagai pasangan (row, index input atau None jika baris tersebut
+        adalah titik yang sebelumnya ditahan).
+        """
+        if not self.enabled:
+            return [(row, index) for index, row in enumerate(rows)]
+
+        positions = {id(row): index for index, row in enumerate(rows)}
+        output = []
+        with self._lock:
+            for row in rows:
+                self._stats["received"] += 1
+                state = self._states.get(row[0])
+                if state is None:
+                    self._states[row[0]] = _SensorState(row)
+                    output.append(row)
+                    continue
+                if row[3] < state.last_time:
+                    # Data terlambat tidak ikut dikompresi
+                    output.append(row)
+                    continue
+                state.last_time = row[3]
+                output.extend(self._offer(state, row, self.sensor_tolerances.get(row[0], self.tolerance)))
+
+            self._stats["stored"] += len(output)
+            self._stats["dropped"] = self._stats["received"] - self._stats["stored"]
+        return [(row, positions.get(id(row))) for row in output]
+
+    def checkpoint(self, names):
+        """Salinan state sensor sebelum process(), untuk rollback jika insert gagal"""
+        with self._lock:
+            return {name: self._states[name].copy() if name in self._states else None for name in set(names)}
+
+    def rollback(self, checkpoint):
+        """
+        Kembalikan state dari checkpoint (insert gagal): titik ditahan yang ikut
+        batch gagal ditahan lagi dan disimpan saat batch dikirim ulang / di-replay
+        """
+        with self._lock:
+            for name, state in checkpoint.items():
+                if state is None:
+                    self._states.pop(name, None)
+                else:
+                    self._states[name] = state
+
+    def flush(self):
+        """Ambil semua titik yang masih ditahan (dipanggil saat shutdown)"""
+        with self._lock:
+            held = [state.held for state in self._states.values() if state.held is not None]
+            for state in self._states.values():
+                if state.held is not None:
+                    self._store(state, state.held)
+            self._stats["stored"] += len(held)
+            self._stats["dropped"] = self._stats["received"] - self._stats["stored"]
+        return held
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["held"] = sum(1 for state in self._states.values() if state.held is not None)
+        stats.update({
+            "mode": self.mode,
+            "tolerance": self.tolerance,
+            "max_interval": self.max_interval,
+            "ratio": round(stats["received"] / stats["stored"], 2) if stats["stored"] else None,
+        })
+        return stats
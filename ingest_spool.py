@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Spool lokal untuk data sensor saat database tidak tersedia
+
+Data ditulis append-only ke file segment JSON lines
+(<spool_dir>/segment-<nomor>.jsonl). Thread syncer melakukan fsync secara
+batch (group commit): append baru selesai setelah data ada di disk, tapi
+banyak append berbagi satu fsync. Segment dirotasi setelah mencapai
+segment_bytes. Thread replay menulis ulang segment tertua ke database dalam
+batch saat database kembali, mencatat offset (checkpoint) setelah setiap
+batch, lalu menghapus segment yang sudah selesai.
+"""
+
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Hasil write untuk data yang masuk spool (belum punya id sensor)
+SPOOLED_READING = "spooled"
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{12})\.jsonl$")
+
+# Spool configuration (bisa diubah lewat environment variable)
+SPOOL_CONFIG = {
+    "directory": os.getenv(
+        "SENSOR_SPOOL_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "spool")
+    ),
+    "segment_bytes": int(float(os.getenv("SENSOR_SPOOL_SEGMENT_MB", "16")) * 1024 * 1024),
+    "fsync_interval": float(os.getenv("SENSOR_SPOOL_FSYNC_MS", "20")) / 1000,
+    "replay_batch": int(os.getenv("SENSOR_SPOOL_REPLAY_BATCH", "2000")),
+    "replay_interval": float(os.getenv("SENSOR_SPOOL_REPLAY_S", "5")),
+}
+
+def encode_row(row):
+    """Baris sensor (nama_sensor, tanggal, nilai, waktu, seq) -> satu baris JSON"""
+    return json.dumps([row[0], row[2], row[3].isoformat(), row[4]], separators=(",", ":")).encode("utf-8") + b"\n"
+
+def decode_row(line):
+    nama_sensor, nilai, waktu, seq = json.loads(line)
+    waktu = datetime.fromisoformat(waktu)
+    return (nama_sensor, waktu.date(), nilai, waktu, seq)
+
+class IngestSpool:
+    """Spool append-only dengan fsync batch, rotasi segment dan replay ke database"""
+
+    def __init__(self, write_batch, directory, segment_bytes=16 * 1024 * 1024, fsync_interval=0.02,
+                 replay_batch=2000, replay_interval=5.0, retry_errors=(Exception,), ready=None):
+        # write_batch: callable(rows) yang menulis ke database
+        # retry_errors: error yang berarti database belum siap (replay dicoba lagi nanti);
+        # error lain berarti batch tidak bisa ditulis dan dipindah ke file rejected-*
+        # ready: callable opsional, replay hanya dicoba jika mengembalikan True
+        self.write_batch = write_batch
+        self.ready = ready
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.replay_batch = replay_batch
+        self.replay_interval = replay_interval
+        self.retry_errors = retry_errors
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._file = None
+        self._segment = None
+        self._size = 0
+        self._written = 0   # Nomor append terakhir
+        self._synced = 0    # Nomor append terakhir yang sudah di-fsync
+        self._next_segment = max(self._segment_numbers(), default=0) + 1
+        self._remove_orphan_checkpoints()
+
+        self._syncer = None
+        self._replayer = None
+        self._stop = threading.Event()
+        self._wake_replay = threading.Event()
+        self._replay_lock = threading.Lock()
+
+        self._stats = {
+            "spooled_rows": 0,
+            "pending_rows": sum(self._count_pending(path) for path in self._sealed_segments()),
+            "fsyncs": 0,
+            "replayed_rows": 0,
+            "replay_batches": 0,
+            "replay_failures": 0,
+            "rejected_rows": 0,
+            "last_replay_rate": None,
+            "last_replay": None,
+        }
+        if self._stats["pending_rows"]:
+            logger.info(f"📼 Spool {directory}: {self._stats['pending_rows']} readings pending from previous run")
+
+    def _segment_numbers(self):
+        return [int(match.group(1)) for match in map(SEGMENT_PATTERN.match, os.listdir(self.directory)) if match]
+
+    def _sealed_segments(self):
+        """Path segment yang tidak sedang ditulis, urut dari yang tertua"""
+        with self._cond:
+            paths = [
+                os.path.join(self.directory, f"segment-{number:012d}.jsonl")
+                for number in sorted(self._segment_numbers())
+            ]
+            return [path for path in paths if path != self._segment]
+
+    def _remove_orphan_checkpoints(self):
+        """Hapus checkpoint yang segment-nya sudah selesai di-replay (crash sebelum dibersihkan)"""
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".offset") and not os.path.exists(os.path.join(self.directory, filename[:-len(".offset")])):
+                os.remove(os.path.join(self.directory, filename))
+
+    def _checkpoint_path(self, path):
+        return f"{path}.offset"
+
+    def _load_checkpoint(self, path):
+        try:
+            with open(self._checkpoint_path(path)) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _save_checkpoint(self, path, offset):
+        tmp_path = f"{self._checkpoint_path(path)}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._checkpoint_path(path))
+
+    def _count_pending(self, path):
+        with open(path, "rb") as f:
+            f.seek(self._load_checkpoint(path))
+            return sum(1 for line in f if line.endswith(b"\n"))
+
+    def _seal(self):
+        """Tutup segment aktif (lock sudah dipegang); append berikutnya membuka segment baru"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._stats["fsyncs"] += 1
+        self._synced = self._written
+        self._file = None
+        self._segment = None
+        self._size = 0
+        self._cond.notify_all()
+
+    def _open_segment(self):
+        self._segment = os.path.join(self.directory, f"segment-{self._next_segment:012d}.jsonl")
+        self._next_segment += 1
+        self._file = open(self._segment, "ab")
+        self._size = 0
+
+    def _sync(self):
+        """fsync semua append sampai saat ini (lock sudah dipegang)"""
+        if self._synced >= self._written:
+            return
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._stats["fsyncs"] += 1
+        self._synced = self._written
+        self._cond.notify_all()
+
+    def append(self, rows):
+        """Tulis baris ke spool; kembali setelah data sudah di-fsync ke disk"""
+        data = b"".join(encode_row(row) for row in rows)
+        with self._cond:
+            if self._file is None or self._size >= self.segment_bytes:
+                self._seal()
+                self._open_segment()
+            self._file.write(data)
+            self._size += len(data)
+            self._written += 1
+            ticket = self._written
+            self._stats["spooled_rows"] += len(rows)
+            self._stats["pending_rows"] += len(rows)
+
+            if not (self._syncer and self._syncer.is_alive()):
+                self._sync()
+            self._cond.notify_all()
+            while self._synced < ticket:
+                self._cond.wait()
+        self._wake_replay.set()
+
+    def replay_once(self):
+        """
+        Tulis ulang semua data di spool ke database. Mengembalikan jumlah baris
+        yang di-replay; berhenti (tanpa exception) jika database belum siap.
+        """
+        with self._replay_lock:
+            with self._cond:
+                if self._file is not None and self._size:
+                    self._seal()
+
+            started = time.monotonic()
+            replayed = 0
+            for path in self._sealed_segments():
+                done, count = self._replay_segment(path)
+                replayed += count
+                if not done:
+                    break
+
+            if replayed:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._stats["last_replay_rate"] = round(replayed / elapsed, 1) if elapsed > 0 else None
+                    self._stats["last_replay"] = time.time()
+                logger.info(f"📼 Replayed {replayed} spooled readings in {elapsed:.1f}s")
+            return replayed
+
+    def _replay_segment(self, path):
+        """Replay satu segment dari checkpoint. Mengembalikan (selesai, jumlah baris)."""
+        offset = self._load_checkpoint(path)
+        replayed = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            batch, batch_bytes = [], 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Baris terakhir tidak lengkap (crash saat menulis)
+                batch_bytes += len(line)
+                try:
+                    batch.append(decode_row(line))
+                except ValueError as e:
+                    logger.error(f"Skipping corrupt spool line in {path}: {e}")
+                    with self._cond:
+                        self._stats["pending_rows"] -= 1
+                if len(batch) >= self.replay_batch:
+                    if not self._replay_batch(path, batch):
+                        return False, replayed
+                    replayed += len(batch)
+                    offset += batch_bytes
+                    self._save_checkpoint(path, offset)
+                    batch, batch_bytes = [], 0
+
+            if batch_bytes:
+                if batch and not self._replay_batch(path, batch):
+                    return False, replayed
+                replayed += len(batch)
+                # Checkpoint batch terakhir juga, agar crash sebelum segment
+                # dihapus tidak membuat batch ini di-replay ulang
+                offset += batch_bytes
+                self._save_checkpoint(path, offset)
+
+        # Segment dihapus dulu; checkpoint tanpa segment dibersihkan saat start
+        os.remove(path)
+        if os.path.exists(self._checkpoint_path(path)):
+            os.remove(self._checkpoint_path(path))
+        return True, replayed
+
+    def _replay_batch(self, path, rows):
+        try:
+            self.write_batch(rows)
+        except self.retry_errors as e:
+            with self._cond:
+                self._stats["replay_failures"] += 1
+            logger.warning(f"Spool replay paused, database not ready: {e}")
+            return False
+        except Exception as e:
+            # Data tidak bisa ditulis (bukan karena database mati), simpan terpisah
+            rejected = os.path.join(self.directory, f"rejected-{os.path.basename(path)}")
+            with open(rejected, "ab") as f:
+                f.write(b"".join(encode_row(row) for row in rows))
+            logger.error(f"Spool replay rejected {len(rows)} readings (saved to {rejected}): {e}")
+            with self._cond:
+                self._stats["rejected_rows"] += len(rows)
+                self._stats["pending_rows"] -= len(rows)
+            return True
+
+        with self._cond:
+            self._stats["replayed_rows"] += len(rows)
+            self._stats["replay_batches"] += 1
+            self._stats["pending_rows"] -= len(rows)
+        return True
+
+    def start(self):
+        if self._syncer and self._syncer.is_alive():
+            return
+        self._stop.clear()
+        self._syncer = threading.Thread(target=self._run_syncer, name="spool-syncer", daemon=True)
+        self._replayer = threading.Thread(target=self._run_replayer, name="spool-replayer", daemon=True)
+        self._syncer.start()
+        self._replayer.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake_replay.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in (self._syncer, self._replayer):
+            if thread:
+                thread.join(5)
+        self._syncer = self._replayer = None
+        with self._cond:
+            self._seal()
+
+    def _run_syncer(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while self._synced >= self._written and not self._stop.is_set():
+                    self._cond.wait()
+            # Tunggu sebentar agar append lain ikut fsync yang sama
+            time.sleep(self.fsync_interval)
+            with self._cond:
+                self._sync()
+
+    def _run_replayer(self):
+        while not self._stop.is_set():
+            self._wake_replay.wait(self.replay_interval)
+            self._wake_replay.clear()
+            if self._stop.is_set():
+                break
+            if self.pending_rows() and (self.ready is None or self.ready()):
+                try:
+                    self.replay_once()
+                except Exception as e:
+                    with self._cond:
+                        self._stats["replay_failures"] += 1
+                    logger.error(f"Spool replay failed: {e}")
+                # Jangan langsung replay lagi setelah append berikutnya
+                self._stop.wait(self.replay_interval)
+
+    def pending_rows(self):
+        with self._cond:
+            return self._stats["pending_rows"]
+
+    def get_stats(self):
+        segments = [os.path.join(self.directory, f"segment-{number:012d}.jsonl") for number in self._segment_numbers()]
+        with self._cond:
+            stats = dict(self._stats)
+        stats.update({
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(path) for path in segments if os.path.exists(path)),
+            "directory": self.directory,
+            "running": bool(self._syncer and self._syncer.is_alive()),
+        })
+        return stats
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Latest-value store in-memory: nilai terbaru, waktu dan jumlah data per sensor
+
+Diupdate setiap kali data sensor di-commit oleh proses ini dan di-warm dari
+database saat startup, sehingga endpoint status/stats tidak perlu query
+untuk "nilai sekarang". Jumlah data per sensor = jumlah pembacaan yang
+diterima (sama dengan rollup, termasuk yang tidak disimpan karena ingest
+compression). Catatan: setiap worker punya store sendiri; jika API
+dijalankan dengan banyak worker, set LATEST_VALUES_ENABLED=false.
+"""
+
+from contextlib import contextmanager
+from psycopg2.extras import RealDictCursor
+import logging
+import os
+import threading
+
+from sensor_query import LATEST_VALUES_CTE
+
+logger = logging.getLogger(__name__)
+
+LATEST_VALUES_ENABLED = os.getenv("LATEST_VALUES_ENABLED", "true").lower() == "true"
+
+# Jumlah per sensor dari rollup harian (satu baris per sensor per hari),
+# bukan COUNT(*) ke seluruh tabel sensor
+WARM_QUERY = LATEST_VALUES_CTE + """
+SELECT l.nama_sensor, l.nilai, l.waktu, c.jumlah
+FROM latest l
+LEFT JOIN (
+    SELECT id_device, SUM(jumlah)::BIGINT AS jumlah FROM sensor_rollup_1d GROUP BY id_device
+) c ON c.id_device = l.id_device
+"""
+
+class LatestValueStore:
+    """Dict nama_sensor -> {nilai, waktu, count} yang thread-safe"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+        # Gate antara commit+update dan warm(): warm menunggu commit yang sedang
+        # berjalan dan menahan commit baru selama query, jadi setiap data
+        # dihitung tepat sekali (di snapshot warm atau lewat update)
+        self._gate = threading.Condition()
+        self._inflight = 0
+        self._warming = False
+        self.ready = False
+
+    @contextmanager
+    def committing(self):
+        """Bungkus commit data sensor + update_rows agar konsisten dengan warm()"""
+        with self._gate:
+            while self._warming:
+                self._gate.wait()
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            with self._gate:
+                self._inflight -= 1
+                self._gate.notify_all()
+
+    def update(self, nama_sensor, nilai, waktu):
+        """Catat satu data baru; nilai hanya diganti jika waktunya tidak lebih lama"""
+        with self._lock:
+            entry = self._values.get(nama_sensor)
+            if entry is None:
+                self._values[nama_sensor] = {"nilai": nilai, "waktu": waktu, "count": 1}
+                return
+            entry["count"] += 1
+            if entry["waktu"] is None or (waktu is not None and waktu >= entry["waktu"]):
+                entry["nilai"] = nilai
+                entry["waktu"] = waktu
+
+    def update_rows(self, rows):
+        """Update dari baris sensor (nama_sensor, tanggal, nilai, waktu)"""
+        for row in rows:
+            self.update(row[0], row[2], row[3])
+
+    def warm(self, conn):
+        """Isi store dari database (nilai terbaru dan jumlah data per sensor)"""
+        with self._gate:
+            self._warming = True
+            while self._inflight:
+                self._gate.wait()
+        try:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute(WARM_QUERY)
+            rows = cursor.fetchall()
+            cursor.close()
+
+            with self._lock:
+                for row in rows:
+                    entry = self._values.setdefault(row["nama_sensor"], {"nilai": None, "waktu": None})
+                    # Semua data yang sudah di-update sebelumnya juga sudah
+                    # ter-commit (ada di snapshot), jadi count diganti, bukan ditambah
+                    entry["count"] = row["jumlah"] or 0
+                    if entry["waktu"] is None or (row["waktu"] is not None and row["waktu"] > entry["waktu"]):
+                        entry["nilai"] = row["nilai"]
+                        entry["waktu"] = row["waktu"]
+                self.ready = True
+        finally:
+            with self._gate:
+                self._warming = False
+                self._gate.notify_all()
+
+        logger.info(f"Latest-value store warmed with {len(rows)} sensors")
+
+    def get(self, nama_sensor):
+        """Salinan entry untuk satu sensor, atau None"""
+        with self._lock:
+            entry = self._values.get(nama_sensor)
+            return dict(entry) if entry else None
+
+    def snapshot(self):
+        """List nilai terbaru semua sensor, urut nama"""
+        with self._lock:
+            return [
+                {"nama_sensor": name, **entry}
+                for name, entry in sorted(self._values.items())
+            ]
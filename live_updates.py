@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Broadcast in-memory untuk live update dashboard lewat Server-Sent Events
+
+Ingest path memanggil publish() sekali per batch, lalu event disebar ke
+semua subscriber. Beban database tidak bertambah dengan jumlah viewer.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Jumlah event yang boleh tertahan per subscriber sebelum event dibuang
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Interval komentar keep-alive SSE (detik)
+KEEPALIVE_INTERVAL = 15
+
+class LiveBroadcaster:
+    """Fan-out event ke semua subscriber SSE dari satu event loop"""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._loop = None
+        self._subscribers = set()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "published": 0,
+            "dropped": 0,
+        }
+
+    def attach_loop(self, loop):
+        """Simpan event loop aplikasi (dipanggil saat startup)"""
+        self._loop = loop
+
+    def subscribe(self):
+        """Daftarkan subscriber baru, harus dipanggil dari event loop"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event, data):
+        """Kirim event ke semua subscriber. Aman dipanggil dari thread manapun."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        with self._stats_lock:
+            self._stats["published"] += 1
+        try:
+            self._loop.call_soon_threadsafe(self._fanout, message)
+        except RuntimeError:
+            # Event loop sudah berhenti (shutdown)
+            pass
+
+    def _fanout(self, message):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Subscriber lambat: buang event, client bisa catch-up lewat delta-sync
+                with self._stats_lock:
+                    self._stats["dropped"] += 1
+
+    async def stream(self, queue):
+        """Generator SSE untuk satu subscriber"""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield message
+        finally:
+            self.unsubscribe(queue)
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["subscribers"] = len(self._subscribers)
+        return stats
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Downsampling Largest-Triangle-Three-Buckets (LTTB) secara streaming
+
+Rentang [start, end) dibagi menjadi bucket dengan lebar waktu yang sama,
+sehingga titik bisa diproses satu per satu tanpa mengetahui jumlah total
+data. Memori yang dipakai hanya titik di dua bucket terakhir (plus buffer
+awal sebanyak `threshold` titik), bukan seluruh rentang.
+"""
+
+def _average(bucket):
+    count = len(bucket)
+    return (sum(point[0] for point in bucket) / count,
+            sum(point[1] for point in bucket) / count)
+
+def _select(bucket, anchor, target):
+    """Titik di bucket yang membentuk segitiga terbesar dengan anchor dan target"""
+    ax, ay = anchor[0], anchor[1]
+    tx, ty = target[0], target[1]
+    best = None
+    best_area = -1.0
+    for point in bucket:
+        # Dua kali luas segitiga; cukup untuk perbandingan
+        area = abs((ax - tx) * (point[1] - ay) - (ax - point[0]) * (ty - ay))
+        if area > best_area:
+            best_area = area
+            best = point
+    return best
+
+def lttb(points, threshold, start, end):
+    """
+    Generator LTTB untuk titik (x, y, ...) yang terurut naik pada x (detik).
+    `start` dan `end` (detik) menentukan batas bucket waktu. Menghasilkan
+    paling banyak `threshold` titik; jika data lebih sedikit, semua titik
+    dikembalikan apa adanya. Elemen tambahan pada tuple ikut diteruskan.
+    """
+    points = iter(points)
+
+    # Data sedikit: tidak perlu downsampling
+    head = []
+    for point in points:
+        head.append(point)
+        if len(head) > threshold:
+            break
+    else:
+        yield from head
+        return
+
+    if threshold < 3:
+        # Hanya titik pertama dan terakhir
+        last = head[-1]
+        for last in points:
+            pass
+        yield head[0]
+        if threshold == 2:
+            yield last
+        return
+
+    bucket_count = threshold - 2
+    width = max((end - start) / bucket_count, 1e-9)
+
+    def bucket_of(point):
+        return min(max(int((point[0] - start) / width), 0), bucket_count - 1)
+
+    def rest():
+        yield from head[1:]
+        yield from points
+
+    anchor = head[0]
+    yield anchor
+
+    current = []
+    following, following_index = [], None
+    pending = None  # Titik terakhir ditahan dulu; bisa jadi titik penutup
+
+    for point in rest():
+        if pending is not None:
+            index = bucket_of(pending)
+            if following_index is None or index == following_index:
+                following.append(pending)
+                following_index = index
+            else:
+                if current:
+                    anchor = _select(current, anchor, _average(following))
+                    yield anchor
+                current = following
+                following, following_index = [pending], index
+        pending = point
+
+    # Tutup dua bucket terakhir dengan titik penutup sebagai target
+    if current:
+        anchor = _select(current, anchor, _average(following) if following else pending)
+        yield anchor
+    if following:
+        yield _select(following, anchor, pending)
+    yield pending
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Migration runner untuk schema database
+
+Migration ada di folder migrations/ dengan nama <versi>_<nama>.sql atau
+<versi>_<nama>.py (contoh: 0002_sensor_daily_count.sql) dan dijalankan
+berurutan. Versi yang sudah dijalankan dicatat di tabel schema_migrations.
+
+- File .sql dijalankan dalam satu transaksi, kecuali ada baris
+  `-- migrate:no-transaction` (wajib untuk CREATE INDEX CONCURRENTLY);
+  file seperti ini dijalankan per statement dalam mode autocommit.
+- File .py harus punya fungsi upgrade(conn). Set TRANSACTIONAL = False
+  untuk menjalankannya dalam mode autocommit.
+
+    python migrate.py            # jalankan migration yang belum diterapkan
+    python migrate.py status     # tampilkan status semua migration
+"""
+
+from datetime import datetime
+import argparse
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import time
+
+import psycopg2
+
+from database_config import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+
+# Jalankan migration saat aplikasi start (default: hanya lewat CLI)
+MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "0") == "1"
+
+# Kunci advisory agar beberapa worker tidak menjalankan migration bersamaan
+MIGRATION_LOCK_ID = 7_220_190
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(20) PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    checksum VARCHAR(64) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    duration_ms INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+class MigrationError(Exception):
+    """Migration gagal dijalankan"""
+
+class Migration:
+    """Satu file migration"""
+
+    def __init__(self, path):
+        self.path = path
+        self.filename = os.path.basename(path)
+        match = MIGRATION_FILE_PATTERN.match(self.filename)
+        self.version, self.name, self.kind = match.groups()
+        with open(path, "rb") as f:
+            self.source = f.read()
+        self.checksum = hashlib.sha256(self.source).hexdigest()
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(f"migration_{self.version}", self.path)
+            self._module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._module)
+        return self._module
+
+    @property
+    def transactional(self):
+        if self.kind == "py":
+            return getattr(self.module, "TRANSACTIONAL", True)
+        return NO_TRANSACTION_MARKER not in self.source.decode()
+
+    def statements(self):
+        """Statement SQL satu per satu (untuk migration tanpa transaksi)"""
+        lines = [line for line in self.source.decode().splitlines() if not line.strip().startswith("--")]
+        return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+    def run(self, conn):
+        cursor = conn.cursor()
+        try:
+            if self.kind == "py":
+                self.module.upgrade(conn)
+            elif self.transactional:
+                cursor.execute(self.source.decode())
+            else:
+                for statement in self.statements():
+                    cursor.execute(statement)
+        finally:
+            cursor.close()
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Semua migration di folder, urut versi"""
+    migrations = [
+        Migration(os.path.join(directory, filename))
+        for filename in sorted(os.listdir(directory))
+        if MIGRATION_FILE_PATTERN.match(filename)
+    ]
+    versions = [migration.version for migration in migrations]
+    duplicates = {version for version in versions if versions.count(version) > 1}
+    if duplicates:
+        raise MigrationError(f"Versi migration duplikat: {', '.join(sorted(duplicates))}")
+    return migrations
+
+def applied_migrations(conn):
+    """Dict versi -> checksum migration yang sudah dijalankan"""
+    cursor = conn.cursor()
+    cursor.execute(CREATE_MIGRATIONS_TABLE)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    applied = dict(cursor.fetchall())
+    cursor.close()
+    conn.commit()
+    return applied
+
+def _record(conn, migration, duration_ms):
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+        (migration.version, migration.name, migration.checksum, duration_ms)
+    )
+    cursor.close()
+
+def apply_migration(conn, migration):
+    """Jalankan satu migration dan catat versinya"""
+    started = time.monotonic()
+    try:
+        if migration.transactional:
+            migration.run(conn)
+            _record(conn, migration, int((time.monotonic() - started) * 1000))
+            conn.commit()
+        else:
+            conn.autocommit = True
+            try:
+                migration.run(conn)
+            finally:
+                conn.autocommit = False
+            _record(conn, migration, int((time.monotonic() - started) * 1000))
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise MigrationError(f"Migration {migration.filename} gagal: {e}") from e
+
+    logger.info(f"✅ Applied migration {migration.filename} ({time.monotonic() - started:.1f}s)")
+
+def run_migrations(directory=MIGRATIONS_DIR):
+    """
+    Jalankan semua migration yang belum diterapkan (pakai koneksi sendiri,
+    bukan connection pool). Mengembalikan list nama file yang dijalankan.
+    """
+    migrations = discover_migrations(directory)
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        cursor.close()
+        conn.commit()
+
+        applied = applied_migrations(conn)
+        for migration in migrations:
+            if migration.version in applied and applied[migration.version] != migration.checksum:
+                logger.warning(f"⚠️ Migration {migration.filename} berubah setelah dijalankan")
+
+        pending = [migration for migration in migrations if migration.version not in applied]
+        for migration in pending:
+            apply_migration(conn, migration)
+        return [migration.filename for migration in pending]
+    finally:
+        conn.close()  # Advisory lock ikut dilepas
+
+def migration_status(directory=MIGRATIONS_DIR):
+    """List (filename, applied_at atau None) untuk semua migration"""
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        applied_migrations(conn)
+        cursor = conn.cursor()
+        cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        applied = dict(cursor.fetchall())
+        cursor.close()
+    finally:
+        conn.close()
+    return [(migration.filename, applied.get(migration.version)) for migration in discover_migrations(directory)]
+
+def index_exists(cursor, name):
+    """Status index: None jika tidak ada, True jika valid, False jika invalid (CONCURRENTLY gagal)"""
+    cursor.execute("""
+    SELECT i.indisvalid
+    FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+    WHERE c.relname = %s
+    """, (name,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def create_index_concurrently(conn, name, table, columns):
+    """
+    CREATE INDEX CONCURRENTLY yang juga bisa dipakai untuk partitioned table:
+    index dibuat ON ONLY di parent, lalu index setiap partisi dibuat CONCURRENTLY
+    dan di-ATTACH. Index invalid sisa percobaan sebelumnya dibuat ulang.
+    Koneksi harus dalam mode autocommit.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass", (table,))
+        partitioned = cursor.fetchone()[0]
+
+        if not partitioned:
+            if index_exists(cursor, name) is False:
+                cursor.execute(f"DROP INDEX CONCURRENTLY {name}")
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+            return
+
+        if index_exists(cursor, name) is True:
+            return
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} ({columns})")
+
+        cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+        """, (table,))
+        for (partition,) in cursor.fetchall():
+            child = f"{partition}_{name[len('idx_'):] if name.startswith('idx_') else name}"[:63]
+            cursor.execute("""
+            SELECT 1 FROM pg_inherits i
+            WHERE i.inhparent = %s::regclass AND i.inhrelid = (
+                SELECT c.oid FROM pg_class c WHERE c.relname = %s
+            )
+            """, (name, child))
+            if cursor.fetchone():
+                continue
+            if index_exists(cursor, child) is False:
+                cursor.execute(f"DROP INDEX CONCURRENTLY {child}")
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} ({columns})")
+            cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+    finally:
+        cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Jalankan migration schema database")
+    parser.add_argument("command", nargs="?", default="up", choices=["up", "status"])
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for filename, applied_at in migration_status():
+            state = f"applied {applied_at:%Y-%m-%d %H:%M:%S}" if isinstance(applied_at, datetime) else "pending"
+            print(f"{filename:<45} {state}")
+        return
+
+    applied = run_migrations()
+    if applied:
+        for filename in applied:
+            print(f"✅ {filename}")
+    else:
+        print("✅ Database sudah up to date")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+-- Schema awal (acuan_baku, op, sensor, transaksi_op) beserta data contoh.
+-- Memakai IF NOT EXISTS agar aman dijalankan di database yang sudah ada.
+
+SET timezone = '+00:00';
+
+CREATE TABLE IF NOT EXISTS acuan_baku (
+    id SERIAL PRIMARY KEY,
+    min FLOAT NOT NULL,
+    max FLOAT NOT NULL,
+    status VARCHAR(50) DEFAULT NULL
+);
+
+COMMENT ON COLUMN acuan_baku.status IS 'Contoh: Normal, Waspada, Bahaya';
+
+CREATE TABLE IF NOT EXISTS op (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    telp VARCHAR(20) DEFAULT NULL,
+    status VARCHAR(20) DEFAULT 'Umum'
+);
+
+-- Dipartisi per bulan di migration 0006
+CREATE TABLE IF NOT EXISTS sensor (
+    id SERIAL PRIMARY KEY,
+    nama_sensor VARCHAR(100) NOT NULL,
+    tanggal DATE NOT NULL,
+    nilai FLOAT NOT NULL,
+    waktu TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS transaksi_op (
+    id SERIAL PRIMARY KEY,
+    tanggal TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    id_sensor INTEGER DEFAULT NULL,
+    id_op INTEGER DEFAULT NULL,
+    action TEXT NOT NULL
+);
+
+COMMENT ON COLUMN transaksi_op.action IS 'Deskripsi aksi yang dilakukan operator atau sistem';
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'transaksi_op_ibfk_2') THEN
+        ALTER TABLE transaksi_op
+        ADD CONSTRAINT transaksi_op_ibfk_2
+        FOREIGN KEY (id_op) REFERENCES op(id) ON DELETE SET NULL;
+    END IF;
+END $$;
+
+-- Data contoh hanya untuk database baru
+INSERT INTO acuan_baku (min, max, status)
+SELECT * FROM (VALUES
+    (20.0, 35.0, 'Normal'),
+    (15.0, 40.0, 'Waspada'),
+    (10.0, 45.0, 'Bahaya')
+) AS v(min, max, status)
+WHERE NOT EXISTS (SELECT 1 FROM acuan_baku);
+
+-- Password yang sudah di-hash menggunakan SHA-256
+-- admin123 -> 240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9
+-- op123 -> 8c6976e5b5410415bde908bd4dee15dfb167a9c873fc4bb8a81f6f2ab448a918
+INSERT INTO op (name, email, password, telp, status)
+SELECT * FROM (VALUES
+    ('Admin', 'admin@sensor.com', '240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9', '08123456789', 'Umum'),
+    ('Operator1', 'op1@sensor.com', '8c6976e5b5410415bde908bd4dee15dfb167a9c873fc4bb8a81f6f2ab448a918', '08123456788', 'Umum')
+) AS v(name, email, password, telp, status)
+WHERE NOT EXISTS (SELECT 1 FROM op);
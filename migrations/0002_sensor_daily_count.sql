@@ -0,0 +1,12 @@
+-- Counter jumlah data sensor per hari untuk /sensor-stats (di-maintain oleh ingest path)
+
+CREATE TABLE IF NOT EXISTS sensor_daily_count (
+    tanggal DATE PRIMARY KEY,
+    jumlah BIGINT NOT NULL DEFAULT 0
+);
+
+COMMENT ON TABLE sensor_daily_count IS 'Jumlah data sensor per hari, diupdate setiap insert ke tabel sensor';
+
+INSERT INTO sensor_daily_count (tanggal, jumlah)
+SELECT tanggal, COUNT(*) FROM sensor GROUP BY tanggal
+ON CONFLICT (tanggal) DO UPDATE SET jumlah = EXCLUDED.jumlah;
@@ -0,0 +1,16 @@
+-- Event perubahan state alert sensor (dihasilkan alert engine di ingest path)
+
+CREATE TABLE IF NOT EXISTS sensor_alert (
+    id SERIAL PRIMARY KEY,
+    nama_sensor VARCHAR(100) NOT NULL,
+    waktu TIMESTAMP NOT NULL,
+    from_severity SMALLINT NOT NULL,
+    to_severity SMALLINT NOT NULL,
+    status VARCHAR(100) NOT NULL,
+    nilai FLOAT NOT NULL
+);
+
+COMMENT ON COLUMN sensor_alert.to_severity IS '0 = Normal, 1 = Waspada, 2 = Bahaya';
+
+CREATE INDEX IF NOT EXISTS idx_sensor_alert_waktu ON sensor_alert (waktu DESC);
+CREATE INDEX IF NOT EXISTS idx_sensor_alert_nama_waktu ON sensor_alert (nama_sensor, waktu DESC);
@@ -0,0 +1,15 @@
+-- Riwayat state sistem pendingin (control loop di server); baris terbaru = state saat ini
+
+CREATE TABLE IF NOT EXISTS cooling_state (
+    id SERIAL PRIMARY KEY,
+    waktu TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    is_on BOOLEAN NOT NULL,
+    mode VARCHAR(20) NOT NULL DEFAULT 'auto',
+    reason TEXT,
+    nama_sensor VARCHAR(100) DEFAULT NULL,
+    nilai FLOAT DEFAULT NULL
+);
+
+COMMENT ON COLUMN cooling_state.mode IS 'auto = dikontrol server, manual = diatur admin';
+
+CREATE INDEX IF NOT EXISTS idx_cooling_state_waktu ON cooling_state (waktu DESC);
@@ -0,0 +1,65 @@
+-- Rollup data sensor per menit/jam/hari (jumlah, min, max, sum, sum of squares),
+-- di-maintain oleh ingest path
+
+CREATE TABLE IF NOT EXISTS sensor_rollup_1m (
+    nama_sensor VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    jumlah BIGINT NOT NULL,
+    min FLOAT NOT NULL,
+    max FLOAT NOT NULL,
+    sum FLOAT NOT NULL,
+    sumsq FLOAT NOT NULL,
+    PRIMARY KEY (nama_sensor, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS sensor_rollup_1h (
+    nama_sensor VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    jumlah BIGINT NOT NULL,
+    min FLOAT NOT NULL,
+    max FLOAT NOT NULL,
+    sum FLOAT NOT NULL,
+    sumsq FLOAT NOT NULL,
+    PRIMARY KEY (nama_sensor, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS sensor_rollup_1d (
+    nama_sensor VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    jumlah BIGINT NOT NULL,
+    min FLOAT NOT NULL,
+    max FLOAT NOT NULL,
+    sum FLOAT NOT NULL,
+    sumsq FLOAT NOT NULL,
+    PRIMARY KEY (nama_sensor, bucket)
+);
+
+COMMENT ON TABLE sensor_rollup_1m IS 'Agregat data sensor per menit, diupdate setiap insert ke tabel sensor';
+
+-- Isi rollup dari data yang sudah ada
+INSERT INTO sensor_rollup_1m (nama_sensor, bucket, jumlah, min, max, sum, sumsq)
+SELECT nama_sensor, date_trunc('minute', waktu), COUNT(*), MIN(nilai), MAX(nilai), SUM(nilai), SUM(nilai * nilai)
+FROM sensor
+WHERE waktu IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (nama_sensor, bucket) DO UPDATE SET
+    jumlah = EXCLUDED.jumlah, min = EXCLUDED.min, max = EXCLUDED.max,
+    sum = EXCLUDED.sum, sumsq = EXCLUDED.sumsq;
+
+INSERT INTO sensor_rollup_1h (nama_sensor, bucket, jumlah, min, max, sum, sumsq)
+SELECT nama_sensor, date_trunc('hour', waktu), COUNT(*), MIN(nilai), MAX(nilai), SUM(nilai), SUM(nilai * nilai)
+FROM sensor
+WHERE waktu IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (nama_sensor, bucket) DO UPDATE SET
+    jumlah = EXCLUDED.jumlah, min = EXCLUDED.min, max = EXCLUDED.max,
+    sum = EXCLUDED.sum, sumsq = EXCLUDED.sumsq;
+
+INSERT INTO sensor_rollup_1d (nama_sensor, bucket, jumlah, min, max, sum, sumsq)
+SELECT nama_sensor, date_trunc('day', waktu), COUNT(*), MIN(nilai), MAX(nilai), SUM(nilai), SUM(nilai * nilai)
+FROM sensor
+WHERE waktu IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (nama_sensor, bucket) DO UPDATE SET
+    jumlah = EXCLUDED.jumlah, min = EXCLUDED.min, max = EXCLUDED.max,
+    sum = EXCLUDED.sum, sumsq = EXCLUDED.sumsq;
@@ -0,0 +1,59 @@
+"""
+Ubah tabel sensor menjadi partitioned table (range partition bulanan pada waktu).
+
+Data lama disalin ke partisi baru dalam satu transaksi; jalankan saat ingest
+dihentikan. Index selain primary key dibuat di migration 0007 (CONCURRENTLY).
+"""
+
+CONVERT_SENSOR = """
+-- Foreign key transaksi_op -> sensor tidak didukung untuk partisi yang bisa di-drop
+ALTER TABLE transaksi_op DROP CONSTRAINT IF EXISTS transaksi_op_ibfk_1;
+
+ALTER TABLE sensor RENAME TO sensor_legacy;
+ALTER INDEX IF EXISTS sensor_pkey RENAME TO sensor_legacy_pkey;
+DROP INDEX IF EXISTS idx_sensor_nama_waktu;
+UPDATE sensor_legacy SET waktu = tanggal::timestamp WHERE waktu IS NULL;
+
+CREATE TABLE sensor (
+    id INTEGER NOT NULL DEFAULT nextval('sensor_id_seq'),
+    nama_sensor VARCHAR(100) NOT NULL,
+    tanggal DATE NOT NULL,
+    nilai FLOAT NOT NULL,
+    waktu TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, waktu)
+) PARTITION BY RANGE (waktu);
+
+ALTER SEQUENCE sensor_id_seq OWNED BY sensor.id;
+
+-- Data di luar rentang partisi yang ada (misal timestamp device yang salah)
+CREATE TABLE sensor_default PARTITION OF sensor DEFAULT;
+
+-- Partisi bulanan dari data terlama sampai 3 bulan ke depan;
+-- bulan berikutnya dibuat oleh PartitionManager (sensor_partition.py)
+DO $$
+DECLARE
+    month DATE;
+    last_month DATE := date_trunc('month', CURRENT_DATE + INTERVAL '3 months')::date;
+BEGIN
+    SELECT date_trunc('month', COALESCE(MIN(waktu), CURRENT_DATE))::date INTO month FROM sensor_legacy;
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF sensor FOR VALUES FROM (%L) TO (%L)',
+            'sensor_p' || to_char(month, 'YYYYMM'), month, (month + INTERVAL '1 month')::date
+        );
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO sensor (id, nama_sensor, tanggal, nilai, waktu)
+SELECT id, nama_sensor, tanggal, nilai, waktu FROM sensor_legacy;
+
+DROP TABLE sensor_legacy;
+"""
+
+def upgrade(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'sensor'::regclass")
+    if cursor.fetchone()[0] != "p":
+        cursor.execute(CONVERT_SENSOR)
+    cursor.close()
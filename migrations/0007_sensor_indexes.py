@@ -0,0 +1,18 @@
+"""
+Index untuk query yang sering dipakai pada tabel sensor (partitioned):
+- (nama_sensor, waktu DESC): nilai terbaru per sensor, /sensor-data/range, rollup mentah
+- (waktu DESC, id DESC): keyset pagination GET /sensor-data dan latest_data /sensor-stats
+- (tanggal): query dan retensi per tanggal
+
+CREATE INDEX CONCURRENTLY tidak bisa langsung di partitioned table, jadi
+dibuat per partisi lalu di-attach (lihat migrate.create_index_concurrently).
+"""
+
+from migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(conn):
+    create_index_concurrently(conn, "idx_sensor_nama_waktu", "sensor", "nama_sensor, waktu DESC")
+    create_index_concurrently(conn, "idx_sensor_waktu_id", "sensor", "waktu DESC, id DESC")
+    create_index_concurrently(conn, "idx_sensor_tanggal", "sensor", "tanggal")
@@ -0,0 +1,4 @@
+-- migrate:no-transaction
+-- Index untuk GET /transactions (ORDER BY tanggal DESC)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaksi_op_tanggal ON transaksi_op (tanggal DESC);
@@ -0,0 +1,40 @@
+-- Registry sensor: tabel sensor dan rollup hanya menyimpan id_device (integer),
+-- nama sensor disimpan sekali di sensor_device.
+-- Semua baris sensor ditulis ulang; jalankan saat ingest dihentikan.
+
+CREATE TABLE IF NOT EXISTS sensor_device (
+    id SERIAL PRIMARY KEY,
+    nama_sensor VARCHAR(100) NOT NULL UNIQUE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO sensor_device (nama_sensor)
+SELECT nama_sensor FROM sensor
+UNION
+SELECT nama_sensor FROM sensor_rollup_1d
+ORDER BY 1
+ON CONFLICT (nama_sensor) DO NOTHING;
+
+-- Tabel sensor (index idx_sensor_nama_waktu ikut terhapus bersama kolom nama_sensor)
+ALTER TABLE sensor ADD COLUMN id_device INTEGER;
+UPDATE sensor s SET id_device = d.id FROM sensor_device d WHERE d.nama_sensor = s.nama_sensor;
+ALTER TABLE sensor ALTER COLUMN id_device SET NOT NULL;
+ALTER TABLE sensor DROP COLUMN nama_sensor;
+ALTER TABLE sensor
+ADD CONSTRAINT sensor_id_device_fkey
+FOREIGN KEY (id_device) REFERENCES sensor_device(id);
+
+-- Tabel rollup
+DO $$
+DECLARE
+    rollup TEXT;
+BEGIN
+    FOREACH rollup IN ARRAY ARRAY['sensor_rollup_1m', 'sensor_rollup_1h', 'sensor_rollup_1d'] LOOP
+        EXECUTE format('ALTER TABLE %I ADD COLUMN id_device INTEGER', rollup);
+        EXECUTE format('UPDATE %I r SET id_device = d.id FROM sensor_device d WHERE d.nama_sensor = r.nama_sensor', rollup);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN id_device SET NOT NULL', rollup);
+        EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', rollup, rollup || '_pkey');
+        EXECUTE format('ALTER TABLE %I DROP COLUMN nama_sensor', rollup);
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id_device, bucket)', rollup);
+    END LOOP;
+END $$;
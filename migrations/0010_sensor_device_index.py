@@ -0,0 +1,11 @@
+"""
+Index (id_device, waktu DESC) pengganti idx_sensor_nama_waktu: nilai terbaru
+per sensor, /sensor-data/range dan agregat dari data mentah.
+"""
+
+from migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(conn):
+    create_index_concurrently(conn, "idx_sensor_device_waktu", "sensor", "id_device, waktu DESC")
@@ -0,0 +1,13 @@
+-- Ledger nomor urut (seq) dari device/gateway untuk dedupe data yang dikirim ulang.
+-- Tabel sensor dipartisi per waktu sehingga unique index (id_device, seq) tidak
+-- bisa dibuat langsung di sana.
+
+CREATE TABLE IF NOT EXISTS sensor_seq (
+    id_device INTEGER NOT NULL REFERENCES sensor_device (id),
+    seq BIGINT NOT NULL,
+    waktu TIMESTAMP NOT NULL,
+    PRIMARY KEY (id_device, seq)
+);
+
+-- Untuk menghapus ledger lama bersama retensi partisi
+CREATE INDEX IF NOT EXISTS idx_sensor_seq_waktu ON sensor_seq (waktu);
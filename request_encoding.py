@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Middleware ASGI untuk request body terkompresi (Content-Encoding: gzip)
+
+Dipakai edge gateway yang mengirim batch data sensor dalam bentuk gzip.
+Body di-decompress sebelum sampai ke endpoint, dengan batas ukuran hasil
+decompress agar gzip bomb tidak menghabiskan memori.
+"""
+
+import json
+import logging
+import os
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Batas ukuran body setelah decompress (byte)
+MAX_DECOMPRESSED_BYTES = int(os.getenv("REQUEST_MAX_DECOMPRESSED_BYTES", str(20 * 1024 * 1024)))
+
+class GzipRequestMiddleware:
+    """Decompress request body gzip lalu teruskan ke aplikasi tanpa header Content-Encoding"""
+
+    def __init__(self, app, max_size=MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        encoding = next((value for name, value in headers if name == b"content-encoding"), None)
+        if encoding is None or encoding.strip().lower() != b"gzip":
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(b"".join(chunks), self.max_size + 1)
+            if decompressor.unconsumed_tail or len(body) > self.max_size:
+                await self._reject(send, 413, f"Body melebihi {self.max_size} byte setelah decompress")
+                return
+            if not decompressor.eof:
+                raise zlib.error("incomplete gzip stream")
+        except zlib.error as e:
+            await self._reject(send, 400, f"Body gzip tidak valid: {e}")
+            return
+
+        scope = dict(scope)
+        scope["headers"] = [
+            (name, value) for name, value in headers
+            if name not in (b"content-encoding", b"content-length")
+        ] + [(b"content-length", str(len(body)).encode())]
+
+        delivered = False
+
+        async def receive_decompressed():
+            nonlocal delivered
+            if delivered:
+                return await receive()
+            delivered = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, receive_decompressed, send)
+
+    async def _reject(self, send, status, detail):
+        payload = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        })
+        await send({"type": "http.response.body", "body": payload})
@@ -3,6 +3,11 @@ let currentUser = null;
 let sensorChart = null;
 let sensorData = [];
 let refreshInterval = null;
+let lastSensorId = 0; // Id data sensor terbaru yang sudah dimiliki dashboard (delta-sync)
+let recentSensorIds = new Set(); // Id yang sudah dimiliki di sekitar lastSensorId, untuk dedupe delta-sync
+const SENSOR_DEDUPE_WINDOW = 1000; // Jumlah id terakhir yang diingat untuk dedupe polling vs SSE
+let liveSource = null; // EventSource untuk live update (SSE)
+let liveConnected = false; // Selama SSE terhubung, polling dilewati
 
 // Auto-refresh chart data
 let chartRefreshInterval;
@@ -31,6 +36,7 @@ let coolingSystemState = {
 
 // API Configuration
 const API_BASE_URL = 'http://localhost:8000';
+const MAX_DASHBOARD_ROWS = 1000; // Sama dengan ukuran halaman default GET /sensor-data
 
 // DOM Elements
 const loginModal = document.getElementById('loginModal');
@@ -714,6 +720,7 @@ function handleLogout() {
         clearInterval(refreshInterval);
         refreshInterval = null;
     }
+    stopLiveUpdates();
     
     console.log('🚪 User logged out, returned to temperature info section');
 }
@@ -767,7 +774,7 @@ async function loadDashboardData() {
     try {
         console.log('📡 Fetching sensor data, stats, and acuan baku...');
         const [sensorDataResponse, statsResponse, acuanBakuResponse] = await Promise.all([
-            fetchSensorData(), // Tanpa limit - ambil semua data
+            fetchSensorData(MAX_DASHBOARD_ROWS), // Halaman terbaru saja, data baru lewat delta-sync/SSE
             fetchStats(),
             fetchAcuanBaku() // Load acuan baku
         ]);
@@ -777,6 +784,9 @@ async function loadDashboardData() {
         console.log('📋 Acuan baku response:', acuanBakuResponse);
         
         sensorData = sensorDataResponse.data || [];
+        lastSensorId = 0;
+        recentSensorIds = new Set();
+        takeNewSensorRows(sensorData);
         console.log(`📝 Loaded ${sensorData.length} sensor records`);
         
         // Update acuan baku global variable
@@ -831,7 +841,7 @@ async function loadDashboardData() {
 
 async function fetchSensorData(limit = null) {
     try {
-        // Jika tidak ada limit, ambil semua data
+        // Tanpa limit server mengembalikan satu halaman default (bukan semua data)
         const url = limit ? `${API_BASE_URL}/sensor-data?limit=${limit}` : `${API_BASE_URL}/sensor-data`;
         const response = await fetch(url);
         if (!response.ok) {
@@ -847,6 +857,66 @@ async function fetchSensorData(limit = null) {
     }
 }
 
+// Ambil hanya data sensor baru sejak id terakhir (payload kolumnar)
+async function fetchSensorDataSince(lastId) {
+    const response = await fetch(`${API_BASE_URL}/sensor-data/since?id=${lastId}`);
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+    
+    const payload = await response.json();
+    const rows = payload.id.map((id, i) => ({
+        id: id,
+        nama_sensor: payload.nama_sensor[i],
+        tanggal: payload.waktu[i] ? payload.waktu[i].split('T')[0] : null,
+        nilai: payload.nilai[i],
+        waktu: payload.waktu[i]
+    }));
+    
+    return { rows: rows, lastId: payload.last_id, hasMore: payload.has_more };
+}
+
+// Ambil hanya baris yang belum dimiliki dashboard lalu majukan lastSensorId.
+// Polling dan SSE bisa mengirim baris yang sama, dan event SSE dari dua batch
+// bisa tiba tidak berurutan, jadi dedupe memakai set id terakhir, bukan id > lastSensorId.
+function takeNewSensorRows(rows) {
+    const fresh = rows.filter(row => row.id && !recentSensorIds.has(row.id));
+    fresh.forEach(row => {
+        recentSensorIds.add(row.id);
+        lastSensorId = Math.max(lastSensorId, row.id);
+    });
+    
+    const floor = lastSensorId - SENSOR_DEDUPE_WINDOW;
+    recentSensorIds.forEach(id => {
+        if (id <= floor) {
+            recentSensorIds.delete(id);
+        }
+    });
+    return fresh;
+}
+
+// Tambahkan data baru ke sensorData tanpa download ulang seluruh data
+async function syncNewSensorData() {
+    let newRows = [];
+    let hasMore = true;
+    
+    while (hasMore) {
+        const delta = await fetchSensorDataSince(lastSensorId);
+        newRows = newRows.concat(takeNewSensorRows(delta.rows));
+        hasMore = delta.hasMore;
+    }
+    
+    if (newRows.length > 0) {
+        // sensorData diurutkan dari yang terbaru
+        sensorData = newRows.reverse().concat(sensorData).slice(0, MAX_DASHBOARD_ROWS);
+        handleFilter();
+        lastUpdate.textContent = new Date().toLocaleTimeString('id-ID');
+        console.log(`🔄 Delta-sync: ${newRows.length} data baru`);
+    }
+    
+    return newRows.length;
+}
+
 async function fetchStats() {
     try {
         console.log('📡 Fetching stats from:', `${API_BASE_URL}/sensor-stats`);
@@ -1709,9 +1779,20 @@ function refreshData() {
 }
 
 function startAutoRefresh() {
-    // Refresh data every 30 seconds
-    refreshInterval = setInterval(() => {
-        refreshData();
+    // Live update lewat SSE, polling di bawah hanya fallback
+    startLiveUpdates();
+    
+    // Sync data baru every 30 seconds (hanya data sejak id terakhir)
+    refreshInterval = setInterval(async () => {
+        if (liveConnected) {
+            return;
+        }
+        try {
+            await syncNewSensorData();
+        } catch (error) {
+            console.warn('⚠️ Delta-sync failed, reloading all data:', error.message);
+            refreshData();
+        }
         // Also update cooling system with latest data
         if (sensorData && sensorData.length > 0) {
             updateCoolingSystemWithSensorData(sensorData);
@@ -1726,8 +1807,11 @@ function startChartAutoRefresh() {
         clearInterval(chartRefreshInterval);
     }
     
-    // Refresh chart every 10 seconds
+    // Refresh chart every 10 seconds (dilewati selama SSE terhubung)
     chartRefreshInterval = setInterval(async () => {
+        if (liveConnected) {
+            return;
+        }
         try {
             console.log('🔄 Auto-refreshing chart data...');
             const statsResponse = await fetchStats();
@@ -1746,6 +1830,85 @@ function startChartAutoRefresh() {
     console.log('🔄 Chart auto-refresh started (every 10s)');
 }
 
+// Live update dari server (Server-Sent Events)
+function startLiveUpdates() {
+    if (!window.EventSource || liveSource) {
+        return;
+    }
+    
+    liveSource = new EventSource(`${API_BASE_URL}/stream`);
+    
+    liveSource.onopen = async () => {
+        liveConnected = true;
+        console.log('📡 Live update terhubung');
+        // Ambil data yang terlewat selama koneksi terputus
+        try {
+            await syncNewSensorData();
+        } catch (error) {
+            console.warn('⚠️ Catch-up sync failed:', error.message);
+        }
+        fetchServerCoolingState();
+    };
+    
+    liveSource.onerror = () => {
+        // EventSource akan reconnect otomatis, sementara itu polling aktif lagi
+        liveConnected = false;
+        console.warn('⚠️ Live update terputus, fallback ke polling');
+    };
+    
+    liveSource.addEventListener('readings', (event) => {
+        const payload = JSON.parse(event.data);
+        const rows = takeNewSensorRows(payload.id.map((id, i) => ({
+            id: id,
+            nama_sensor: payload.nama_sensor[i],
+            tanggal: payload.waktu[i].split('T')[0],
+            nilai: payload.nilai[i],
+            waktu: payload.waktu[i]
+        }))).sort((a, b) => b.id - a.id);
+        if (rows.length === 0) {
+            return;
+        }
+        
+        sensorData = rows.concat(sensorData).slice(0, MAX_DASHBOARD_ROWS);
+        handleFilter();
+        updateChartWithAcuanBaku(sensorData.slice(0, 50));
+        updateCoolingSystemWithSensorData(sensorData);
+        checkLatestDataForAlerts(rows);
+        
+        // Update counter stats tanpa polling /sensor-stats
+        totalData.textContent = (parseInt(totalData.textContent, 10) || 0) + rows.length;
+        const today = new Date().toISOString().split('T')[0];
+        const todayRows = rows.filter(row => row.tanggal === today).length;
+        todayData.textContent = (parseInt(todayData.textContent, 10) || 0) + todayRows;
+        
+        lastUpdate.textContent = new Date().toLocaleTimeString('id-ID');
+    });
+    
+    liveSource.addEventListener('alert', (event) => {
+        // Hanya perubahan state (dari alert engine di server)
+        const alert = JSON.parse(event.data);
+        const type = alert.to_severity >= 2 ? 'error' : alert.to_severity === 1 ? 'warning' : 'success';
+        showNotification(`${alert.nama_sensor}: ${alert.status} (${alert.nilai})`, type);
+    });
+    
+    liveSource.addEventListener('cooling', (event) => {
+        // Keputusan cooling dibuat oleh control loop di server
+        applyServerCoolingState(JSON.parse(event.data));
+    });
+    
+    liveSource.addEventListener('acuan_baku', () => {
+        fetchAcuanBaku().then(() => forceRefreshAcuanBakuLines());
+    });
+}
+
+function stopLiveUpdates() {
+    if (liveSource) {
+        liveSource.close();
+        liveSource = null;
+    }
+    liveConnected = false;
+}
+
 function stopChartAutoRefresh() {
     if (chartRefreshInterval) {
         clearInterval(chartRefreshInterval);
@@ -1860,6 +2023,7 @@ window.addEventListener('beforeunload', function() {
     if (chartRefreshInterval) {
         clearInterval(chartRefreshInterval);
     }
+    stopLiveUpdates();
     console.log('🧹 Cleanup completed');
 });
 
@@ -2441,6 +2605,12 @@ function toggleCoolingSystem(toggle) {
     const isOn = toggle.checked;
     coolingSystemState.isOn = isOn;
     
+    // Kirim ke server (control loop pindah ke mode manual)
+    setServerCoolingState(isOn).then(applyServerCoolingState).catch(error => {
+        console.error('❌ Failed to update cooling state on server:', error);
+        showNotification('Gagal mengubah state cooling di server', 'error');
+    });
+    
     // Update UI
     updateCoolingSystemUI();
     
@@ -2480,6 +2650,102 @@ function toggleCoolingSystem(toggle) {
 
 
 
+/**
+ * Kembalikan kontrol cooling ke control loop server (mode auto)
+ */
+function setCoolingAutoMode() {
+    if (!isUserAdmin()) {
+        showAdminAccessDenied();
+        return;
+    }
+    
+    postServerCoolingCommand({ mode: 'auto' })
+        .then(state => {
+            applyServerCoolingState(state);
+            showNotification('Cooling system dikembalikan ke mode Auto', 'success');
+        })
+        .catch(error => {
+            console.error('❌ Failed to switch cooling to auto mode:', error);
+            showNotification('Gagal mengubah mode cooling di server', 'error');
+        });
+}
+
+/**
+ * Kirim perintah cooling manual ke server
+ */
+async function setServerCoolingState(isOn) {
+    return postServerCoolingCommand({ mode: 'manual', is_on: isOn });
+}
+
+async function postServerCoolingCommand(command) {
+    const response = await fetch(`${API_BASE_URL}/cooling`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ...command, id_op: currentUser ? currentUser.id : null })
+    });
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    return response.json();
+}
+
+/**
+ * Ambil state cooling terkini dari server
+ */
+async function fetchServerCoolingState() {
+    try {
+        const response = await fetch(`${API_BASE_URL}/cooling`);
+        if (response.ok) {
+            applyServerCoolingState(await response.json());
+        }
+    } catch (error) {
+        console.error('❌ Failed to fetch cooling state:', error);
+    }
+}
+
+/**
+ * Tampilkan state cooling dari server (GET /cooling atau event SSE 'cooling')
+ */
+function applyServerCoolingState(state) {
+    const wasOn = coolingSystemState.isOn;
+    coolingSystemState.isOn = state.is_on;
+    coolingSystemState.status = state.is_on ? 'cooling' : 'idle';
+    
+    updateCoolingSystemUI();
+    
+    const statusElement = document.getElementById('coolingSystemStatus');
+    if (statusElement) {
+        statusElement.textContent = state.is_on ? 'COOLING' : 'OFF';
+        statusElement.className = `status-badge ${state.is_on ? 'status-cooling' : 'status-idle'}`;
+    }
+    
+    const coolingToggle = document.getElementById('coolingToggle');
+    if (coolingToggle) {
+        coolingToggle.checked = state.is_on;
+    }
+    
+    const labelElement = document.getElementById('coolingStatus');
+    if (labelElement) {
+        labelElement.textContent = state.is_on ? 'ON' : 'OFF';
+    }
+    
+    const modeElement = document.getElementById('coolingMode');
+    if (modeElement) {
+        modeElement.textContent = state.mode === 'auto' ? 'AUTO' : 'MANUAL';
+    }
+    const autoButton = document.getElementById('coolingAutoBtn');
+    if (autoButton) {
+        autoButton.classList.toggle('active', state.mode === 'auto');
+    }
+    
+    if (state.is_on && coolingSystemState.alertState.isActive) {
+        stopTemperatureAlert();
+    }
+    if (wasOn !== state.is_on && state.mode === 'auto') {
+        showNotification(`❄️ ${state.reason} - Cooling system ${state.is_on ? 'activated' : 'deactivated'}`, state.is_on ? 'warning' : 'success');
+    }
+}
+
 /**
  * Automatic cooling system control based on temperature thresholds
  */
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Arsip data sensor lama ke file kolumnar terkompresi (cold tier)
+
+Data yang lebih tua dari SENSOR_ARCHIVE_AFTER_DAYS dipindahkan ke file
+<archive_dir>/<YYYY-MM-DD>/<id_device>.json.gz berisi kolom id/nilai/waktu
+(JSON kolumnar + gzip, tanpa dependency tambahan), lalu dihapus dari tabel
+sensor. Penghapusan baru di-commit setelah file tersimpan (fsync), dan file
+yang sudah ada digabung berdasarkan id, jadi job aman diulang setelah gagal.
+Rollup tidak ikut dihapus sehingga chart rentang panjang tetap lengkap.
+
+    python sensor_archive.py            # arsipkan sekali (default: data > 90 hari)
+"""
+
+from datetime import date, datetime, time, timedelta
+import gzip
+import json
+import logging
+import os
+import threading
+
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT_VERSION = 1
+
+# Archiver configuration (bisa diubah lewat environment variable)
+ARCHIVE_CONFIG = {
+    "directory": os.getenv(
+        "SENSOR_ARCHIVE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive")
+    ),
+    # 0 = archiver tidak berjalan (data tetap di database)
+    "after_days": int(os.getenv("SENSOR_ARCHIVE_AFTER_DAYS", "0")),
+    "check_interval": float(os.getenv("SENSOR_ARCHIVE_CHECK_S", "21600")),
+}
+
+ARCHIVE_DEVICE_DAY_QUERY = """
+DELETE FROM sensor
+WHERE id_device = %s AND waktu >= %s AND waktu < %s
+RETURNING id, nilai, waktu
+"""
+
+class SensorArchive:
+    """Baca/tulis file arsip per hari per sensor"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path_for(self, day, device_id):
+        return os.path.join(self.directory, day.isoformat(), f"{device_id}.json.gz")
+
+    def read_day(self, day, device_id):
+        """Kolom arsip satu sensor satu hari, atau None jika belum diarsipkan"""
+        path = self.path_for(day, device_id)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_day(self, day, device_id, nama_sensor, rows):
+        """
+        Simpan baris (id, nilai, waktu) satu sensor satu hari. Digabung dengan
+        isi file lama (dedupe per id), ditulis ke file sementara lalu di-rename.
+        """
+        merged = {}
+        existing = self.read_day(day, device_id)
+        if existing:
+            for row_id, nilai, waktu in zip(existing["id"], existing["nilai"], existing["waktu"]):
+                merged[row_id] = (nilai, waktu)
+        for row_id, nilai, waktu in rows:
+            merged[row_id] = (nilai, waktu.isoformat())
+
+        ordered = sorted(merged.items(), key=lambda item: (item[1][1], item[0]))
+        payload = {
+            "version": ARCHIVE_FORMAT_VERSION,
+            "id_device": device_id,
+            "nama_sensor": nama_sensor,
+            "tanggal": day.isoformat(),
+            "id": [row_id for row_id, _ in ordered],
+            "nilai": [nilai for _, (nilai, _) in ordered],
+            "waktu": [waktu for _, (_, waktu) in ordered],
+        }
+
+        path = self.path_for(day, device_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+        return len(ordered)
+
+    def iter_range(self, device_id, start, end):
+        """Generator (detik, nilai, waktu, id) dari arsip pada [start, end), urut waktu"""
+        day = start.date()
+        while day <= end.date():
+            columns = self.read_day(day, device_id)
+            if columns:
+                for row_id, nilai, waktu in zip(columns["id"], columns["nilai"], columns["waktu"]):
+                    waktu = datetime.fromisoformat(waktu)
+                    if start <= waktu < end:
+                        yield waktu.timestamp(), nilai, waktu, row_id
+            day += timedelta(days=1)
+
+def archive_day(conn, archive, day):
+    """
+    Pindahkan semua data satu hari ke arsip, per sensor satu transaksi.
+    Mengembalikan jumlah baris yang diarsipkan.
+    """
+    lower = datetime.combine(day, time.min)
+    upper = lower + timedelta(days=1)
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, nama_sensor FROM sensor_device ORDER BY id")
+    devices = cursor.fetchall()
+
+    archived = 0
+    for device_id, nama_sensor in devices:
+        cursor.execute(ARCHIVE_DEVICE_DAY_QUERY, (device_id, lower, upper))
+        rows = cursor.fetchall()
+        if not rows:
+            conn.rollback()
+            continue
+        try:
+            archive.write_day(day, device_id, nama_sensor, rows)
+        except Exception:
+            conn.rollback()
+            raise
+        # Counter harian mengikuti isi tabel sensor (sama seperti retensi partisi)
+        cursor.execute(
+            "UPDATE sensor_daily_count SET jumlah = GREATEST(jumlah - %s, 0) WHERE tanggal = %s",
+            (len(rows), day)
+        )
+        conn.commit()
+        archived += len(rows)
+
+    cursor.close()
+    return archived
+
+def oldest_live_day(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(waktu) FROM sensor")
+    oldest = cursor.fetchone()[0]
+    cursor.close()
+    conn.commit()
+    return oldest.date() if oldest else None
+
+class SensorArchiver:
+    """Thread yang mengarsipkan data lama secara berkala"""
+
+    def __init__(self, directory, after_days=0, check_interval=21600.0):
+        self.archive = SensorArchive(directory)
+        self.after_days = after_days
+        self.check_interval = check_interval
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"runs": 0, "failed": 0, "archived_rows": 0, "archived_days": 0, "last_day": None}
+
+    @property
+    def enabled(self):
+        return self.after_days > 0
+
+    def run_once(self, today=None):
+        """Arsipkan setiap hari yang seluruhnya lebih tua dari batas umur data"""
+        cutoff = (today or date.today()) - timedelta(days=self.after_days)
+        archived_rows = 0
+        archived_days = 0
+
+        with get_db_connection() as conn:
+            day = oldest_live_day(conn)
+            while day is not None and day < cutoff and not self._stop.is_set():
+                rows = archive_day(conn, self.archive, day)
+                if rows:
+                    archived_rows += rows
+                    archived_days += 1
+                    logger.info(f"🧊 Archived {rows} sensor rows for {day}")
+                with self._lock:
+                    self._stats["last_day"] = day.isoformat()
+                # Langsung ke hari berikutnya yang masih punya data
+                next_day = oldest_live_day(conn)
+                day = max(next_day, day + timedelta(days=1)) if next_day else None
+
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["archived_rows"] += archived_rows
+            self._stats["archived_days"] += archived_days
+        return archived_rows
+
+    def start(self):
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sensor-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                with self._lock:
+                    self._stats["failed"] += 1
+                logger.error(f"Sensor archiving failed: {e}")
+            self._stop.wait(self.check_interval)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "enabled": self.enabled,
+            "after_days": self.after_days,
+            "directory": self.archive.directory,
+            "running": bool(self._thread and self._thread.is_alive()),
+        })
+        return stats
+
+if __name__ == "__main__":
+    archiver = SensorArchiver(**{**ARCHIVE_CONFIG, "after_days": ARCHIVE_CONFIG["after_days"] or 90})
+    print(f"🧊 Archiving sensor data older than {archiver.after_days} days to {archiver.archive.directory}")
+    print(f"✅ Archived rows: {archiver.run_once()}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Registry sensor_device: nama sensor -> id integer
+
+Tabel sensor hanya menyimpan id_device; nama sensor disimpan sekali di
+sensor_device. Registry menyimpan mapping nama <-> id di memori proses,
+sehingga ingest path hanya menyentuh database saat ada sensor baru.
+"""
+
+from psycopg2.extras import RealDictCursor, execute_values
+import logging
+import threading
+
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+REGISTER_DEVICES_QUERY = """
+INSERT INTO sensor_device (nama_sensor)
+VALUES %s
+ON CONFLICT (nama_sensor) DO NOTHING
+"""
+
+class DeviceRegistry:
+    """Cache nama_sensor <-> id_device yang thread-safe"""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "registered": 0}
+
+    def _remember(self, rows):
+        with self._lock:
+            for device_id, nama_sensor in rows:
+                self._ids[nama_sensor] = device_id
+                self._names[device_id] = nama_sensor
+
+    def load(self, conn):
+        """Isi cache dari tabel sensor_device"""
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, nama_sensor FROM sensor_device")
+        rows = cursor.fetchall()
+        cursor.close()
+        self._remember(rows)
+        logger.info(f"📟 Device registry loaded: {len(rows)} sensors")
+
+    def resolve(self, names):
+        """
+        Dict nama_sensor -> id_device untuk semua nama. Sensor baru didaftarkan
+        dan di-commit dengan koneksi sendiri, jadi panggil sebelum mengambil
+        koneksi untuk transaksi insert (id tetap valid walaupun insert gagal).
+        """
+        names = set(names)
+        with self._lock:
+            resolved = {name: self._ids[name] for name in names if name in self._ids}
+            self._stats["hits"] += len(resolved)
+        missing = sorted(names - resolved.keys())
+        if not missing:
+            return resolved
+
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Urut nama agar writer paralel mengunci dengan urutan yang sama
+            execute_values(cursor, REGISTER_DEVICES_QUERY, [(name,) for name in missing], page_size=len(missing))
+            registered = cursor.rowcount
+            cursor.execute("SELECT id, nama_sensor FROM sensor_device WHERE nama_sensor = ANY(%s)", (missing,))
+            rows = cursor.fetchall()
+            cursor.close()
+            conn.commit()
+
+        self._remember(rows)
+        with self._lock:
+            self._stats["misses"] += len(missing)
+            self._stats["registered"] += max(registered, 0)
+        resolved.update({nama_sensor: device_id for device_id, nama_sensor in rows})
+        return resolved
+
+    def name_for(self, device_id):
+        with self._lock:
+            return self._names.get(device_id)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["devices"] = len(self._ids)
+        return stats
+
+def fetch_devices(conn):
+    """Semua sensor yang terdaftar, urut nama"""
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute("SELECT id, nama_sensor, created_at FROM sensor_device ORDER BY nama_sensor")
+    devices = cursor.fetchall()
+    cursor.close()
+    return devices
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Helper untuk menulis data sensor ke database (single maupun batch)
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from psycopg2.extras import execute_values
+import logging
+import os
+
+from sensor_rollup import update_rollups
+
+logger = logging.getLogger(__name__)
+
+# Batas jumlah data per request batch
+MAX_BATCH_SIZE = 5000
+
+# Timestamp device boleh lebih maju dari jam server maksimal sekian detik
+MAX_CLOCK_SKEW = timedelta(seconds=float(os.getenv("SENSOR_MAX_CLOCK_SKEW_S", "300")))
+
+# Penanda hasil insert untuk data dengan (sensor, seq) yang sudah pernah diterima
+DUPLICATE_READING = "duplicate"
+
+INSERT_SENSOR_QUERY = """
+INSERT INTO sensor (id_device, tanggal, nilai, waktu)
+VALUES %s
+RETURNING id
+"""
+
+# Advisory lock (per transaksi) yang diambil sebelum id sensor dibagikan dan
+# dilepas saat commit, sehingga id sensor terlihat sesuai urutan commit:
+# delta-sync (id > last_id) tidak melewatkan transaksi dengan id lebih kecil
+# yang commit belakangan. Writer paralel untuk tanggal yang sama sudah antri
+# di baris counter harian, jadi biaya tambahannya kecil.
+SENSOR_INSERT_LOCK_KEY = 0x73656E73
+
+# Counter per hari untuk /sensor-stats (tanpa COUNT(*) ke tabel sensor)
+UPSERT_DAILY_COUNT_QUERY = """
+INSERT INTO sensor_daily_count (tanggal, jumlah)
+VALUES %s
+ON CONFLICT (tanggal) DO UPDATE SET jumlah = sensor_daily_count.jumlah + EXCLUDED.jumlah
+"""
+
+CLAIM_SEQ_QUERY = """
+INSERT INTO sensor_seq (id_device, seq, waktu)
+VALUES %s
+ON CONFLICT (id_device, seq) DO NOTHING
+RETURNING id_device, seq
+"""
+
+def normalize_timestamp(waktu=None):
+    """Ubah timestamp device menjadi waktu lokal tanpa timezone (kolom TIMESTAMP)"""
+    if waktu is None:
+        return datetime.now()
+    if waktu.tzinfo is not None:
+        waktu = waktu.astimezone().replace(tzinfo=None)
+    return waktu
+
+def build_sensor_row(nama_sensor, nilai, waktu=None, seq=None):
+    """
+    Buat tuple baris sensor (nama_sensor, tanggal, nilai, waktu, seq).
+    waktu = timestamp device (default: jam server), seq = nomor urut device
+    untuk dedupe (opsional). ValueError jika waktu terlalu jauh di masa depan.
+    """
+    waktu = normalize_timestamp(waktu)
+    if waktu - datetime.now() > MAX_CLOCK_SKEW:
+        raise ValueError(f"Timestamp {waktu.isoformat()} lebih maju dari jam server")
+    return (nama_sensor, waktu.date(), nilai, waktu, seq)
+
+def claim_sequences(conn, rows, device_ids):
+    """
+    Catat (id_device, seq) di ledger sensor_seq. Mengembalikan list bool sesuai
+    urutan rows: False untuk data yang seq-nya sudah pernah diterima (termasuk
+    duplikat di batch yang sama). Baris tanpa seq selalu True.
+    Dijalankan di transaksi yang sama dengan insert (commit oleh pemanggil).
+    """
+    keys = [(device_ids[row[0]], row[4]) if row[4] is not None else None for row in rows]
+    pending = {}
+    for key, row in zip(keys, rows):
+        if key is not None:
+            pending.setdefault(key, row[3])
+    if not pending:
+        return [True] * len(rows)
+
+    # Urut key agar writer paralel mengunci ledger dengan urutan yang sama
+    values = [key + (waktu,) for key, waktu in sorted(pending.items())]
+    cursor = conn.cursor()
+    try:
+        claimed = execute_values(cursor, CLAIM_SEQ_QUERY, values, page_size=len(values), fetch=True)
+    finally:
+        cursor.close()
+
+    claimed = set(map(tuple, claimed))
+    fresh = []
+    for key in keys:
+        if key is None:
+            fresh.append(True)
+        elif key in claimed:
+            claimed.discard(key)
+            fresh.append(True)
+        else:
+            fresh.append(False)
+    return fresh
+
+def insert_sensor_rows(conn, rows, device_ids, rollup_rows=None):
+    """
+    Insert banyak baris sensor dengan satu multi-row INSERT, sekaligus
+    update counter harian dan rollup di transaksi yang sama.
+    device_ids: dict nama_sensor -> id_device (dari DeviceRegistry.resolve).
+    rollup_rows: baris untuk rollup jika berbeda dari rows (ingest compression:
+    rollup dihitung dari semua data mentah, bukan hanya yang disimpan).
+    Mengembalikan list id sesuai urutan rows. Commit dilakukan oleh pemanggil.
+    """
+    if rollup_rows is None:
+        rollup_rows = rows
+    if not rows and not rollup_rows:
+        return []
+
+    device_rows = [(device_ids[row[0]],) + tuple(row[1:4]) for row in rows]
+
+    # Urutkan per tanggal agar writer paralel mengunci baris counter dengan urutan sama
+    daily_counts = sorted(Counter(row[1] for row in rows).items())
+
+    cursor = conn.cursor()
+    try:
+        results = []
+        if device_rows:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SENSOR_INSERT_LOCK_KEY,))
+            results = execute_values(
+                cursor,
+                INSERT_SENSOR_QUERY,
+                device_rows,
+                page_size=len(device_rows),
+                fetch=True
+            )
+            execute_values(cursor, UPSERT_DAILY_COUNT_QUERY, daily_counts)
+        if rollup_rows is not rows:
+            device_rows = [(device_ids[row[0]],) + tuple(row[1:4]) for row in rollup_rows]
+        if device_rows:
+            update_rollups(cursor, device_rows)
+    finally:
+        cursor.close()
+
+    return [row[0] for row in results]
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Partition manager untuk tabel sensor (range partition bulanan pada waktu)
+
+Thread background membuat partisi beberapa bulan ke depan dan menerapkan
+retensi dengan DROP atau DETACH partisi lama (tanpa DELETE per baris).
+Data di luar rentang partisi (mis. data terlambat dari bulan lampau) masuk
+ke sensor_default dan dipindahkan ke partisi yang benar saat partisi tersebut
+dibuat; partisi untuk bulan lampau dibuat otomatis oleh backfill_partitions.
+
+    python sensor_partition.py            # buat partisi + retensi sekali
+"""
+
+from datetime import date
+import logging
+import os
+import re
+import threading
+
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DROP = "drop"
+RETENTION_DETACH = "detach"
+
+DEFAULT_PARTITION = "sensor_default"
+PARTITION_NAME_PATTERN = re.compile(r"sensor_p\d{6}")
+
+# Partition manager configuration (bisa diubah lewat environment variable)
+PARTITION_CONFIG = {
+    "premake_months": int(os.getenv("SENSOR_PARTITION_PREMAKE", "3")),
+    # 0 = simpan semua partisi
+    "retention_months": int(os.getenv("SENSOR_RETENTION_MONTHS", "0")),
+    "retention_mode": os.getenv("SENSOR_RETENTION_MODE", RETENTION_DETACH),
+    "check_interval": float(os.getenv("SENSOR_PARTITION_CHECK_S", "3600")),
+}
+
+LIST_PARTITIONS_QUERY = """
+SELECT c.relname
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'sensor'::regclass
+ORDER BY c.relname
+"""
+
+def is_partitioned(conn):
+    """True jika tabel sensor sudah berupa partitioned table"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = 'sensor'::regclass")
+    partitioned = cursor.fetchone()[0]
+    cursor.close()
+    return partitioned
+
+def month_start(day, offset=0):
+    """Tanggal 1 pada bulan `day` + offset bulan"""
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+def partition_name(month):
+    return f"sensor_p{month:%Y%m}"
+
+def list_partitions(conn):
+    """Nama partisi bulanan yang terpasang di tabel sensor, urut waktu"""
+    cursor = conn.cursor()
+    cursor.execute(LIST_PARTITIONS_QUERY)
+    names = [name for (name,) in cursor.fetchall() if PARTITION_NAME_PATTERN.fullmatch(name)]
+    cursor.close()
+    return names
+
+def create_partition(conn, month):
+    """
+    Buat partisi satu bulan. Baris bulan tersebut yang sudah terlanjur masuk
+    ke sensor_default dipindahkan dulu, lalu tabel di-ATTACH sebagai partisi
+    (index partitioned ikut dibuat otomatis). Commit oleh pemanggil.
+    """
+    name = partition_name(month)
+    lower, upper = month_start(month), month_start(month, 1)
+
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE TABLE {name} (LIKE sensor INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(f"""
+    WITH moved AS (
+        DELETE FROM {DEFAULT_PARTITION} WHERE waktu >= %s AND waktu < %s RETURNING *
+    )
+    INSERT INTO {name} SELECT * FROM moved
+    """, (lower, upper))
+    moved = cursor.rowcount
+    cursor.execute(f"ALTER TABLE sensor ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+    cursor.close()
+
+    logger.info(f"📦 Created partition {name} ({moved} rows moved from {DEFAULT_PARTITION})")
+    return name
+
+def ensure_partitions(conn, premake_months=3, today=None):
+    """Pastikan partisi bulan ini sampai `premake_months` ke depan sudah ada"""
+    today = today or date.today()
+    existing = set(list_partitions(conn))
+    created = []
+    for offset in range(premake_months + 1):
+        month = month_start(today, offset)
+        if partition_name(month) not in existing:
+            created.append(create_partition(conn, month))
+            conn.commit()
+    return created
+
+def backfill_partitions(conn, retention_months=0, today=None):
+    """
+    Buat partisi untuk bulan lampau yang datanya masuk ke sensor_default
+    (data terlambat dari device/gateway). Bulan di luar retensi dibiarkan.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT DISTINCT date_trunc('month', waktu)::date FROM {DEFAULT_PARTITION}")
+    months = sorted(month for (month,) in cursor.fetchall())
+    cursor.close()
+    conn.commit()
+
+    existing = set(list_partitions(conn))
+    cutoff = month_start(today or date.today(), -retention_months) if retention_months > 0 else None
+    created = []
+    for month in months:
+        if partition_name(month) in existing or (cutoff and month < cutoff):
+            continue
+        created.append(create_partition(conn, month))
+        conn.commit()
+    return created
+
+def apply_retention(conn, retention_months, mode=RETENTION_DETACH, today=None):
+    """
+    Lepas (detach) atau hapus (drop) partisi yang seluruhnya lebih tua dari
+    `retention_months` bulan. Counter harian dan ledger seq untuk rentang tersebut
+    ikut dihapus agar total di /sensor-stats sesuai isi tabel; rollup tetap disimpan.
+    """
+    if retention_months <= 0:
+        return []
+    if mode not in (RETENTION_DROP, RETENTION_DETACH):
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    cutoff = partition_name(month_start(today or date.today(), -retention_months))
+    removed = []
+    for name in list_partitions(conn):
+        if name >= cutoff:
+            break
+        month = date(int(name[-6:-2]), int(name[-2:]), 1)
+
+        cursor = conn.cursor()
+        cursor.execute(f"ALTER TABLE sensor DETACH PARTITION {name}")
+        if mode == RETENTION_DROP:
+            cursor.execute(f"DROP TABLE {name}")
+        cursor.execute(
+            "DELETE FROM sensor_daily_count WHERE tanggal >= %s AND tanggal < %s",
+            (month, month_start(month, 1))
+        )
+        cursor.execute(
+            "DELETE FROM sensor_seq WHERE waktu >= %s AND waktu < %s",
+            (month, month_start(month, 1))
+        )
+        cursor.close()
+        conn.commit()
+
+        removed.append(name)
+        logger.info(f"🗄️ Retention: partition {name} {'dropped' if mode == RETENTION_DROP else 'detached'}")
+    return removed
+
+class PartitionManager:
+    """Thread yang menjalankan pembuatan partisi dan retensi secara berkala"""
+
+    def __init__(self, premake_months=3, retention_months=0, retention_mode=RETENTION_DETACH, check_interval=3600.0):
+        if retention_mode not in (RETENTION_DROP, RETENTION_DETACH):
+            raise ValueError(f"Unknown retention mode: {retention_mode}")
+
+        self.premake_months = premake_months
+        self.retention_months = retention_months
+        self.retention_mode = retention_mode
+        self.check_interval = check_interval
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"runs": 0, "failed": 0, "created": [], "removed": [], "last_run": None}
+
+    def run_once(self):
+        """Buat partisi ke depan lalu terapkan retensi"""
+        with get_db_connection() as conn:
+            if not is_partitioned(conn):
+                logger.warning("Tabel sensor belum dipartisi, jalankan python migrate.py")
+                return [], []
+            created = ensure_partitions(conn, self.premake_months)
+            created += backfill_partitions(conn, self.retention_months)
+            removed = apply_retention(conn, self.retention_months, self.retention_mode)
+
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["created"].extend(created)
+            self._stats["removed"].extend(removed)
+            self._stats["last_run"] = date.today().isoformat()
+        return created, removed
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sensor-partition-manager", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                with self._lock:
+                    self._stats["failed"] += 1
+                logger.error(f"Partition maintenance failed: {e}")
+            self._stop.wait(self.check_interval)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["created"] = list(stats["created"])
+            stats["removed"] = list(stats["removed"])
+        stats.update({
+            "premake_months": self.premake_months,
+            "retention_months": self.retention_months,
+            "retention_mode": self.retention_mode,
+            "running": bool(self._thread and self._thread.is_alive()),
+        })
+        return stats
+
+if __name__ == "__main__":
+    manager = PartitionManager(**PARTITION_CONFIG)
+    created, removed = manager.run_once()
+    print(f"✅ Partitions created: {created or '-'}")
+    print(f"🗄️ Partitions removed: {removed or '-'}")
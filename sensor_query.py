@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Query data sensor: keyset pagination, streaming (NDJSON/CSV) dan rentang waktu (LTTB)
+"""
+
+from datetime import datetime, date
+from psycopg2.extras import RealDictCursor
+import csv
+import heapq
+import io
+import json
+import logging
+
+from database_config import get_db_connection
+from lttb import lttb
+
+logger = logging.getLogger(__name__)
+
+# Ukuran halaman default dan maksimum untuk GET /sensor-data
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+# Jumlah baris maksimum per response delta-sync
+MAX_DELTA_ROWS = 5000
+
+# Jumlah baris yang diambil per round trip dari server-side cursor
+STREAM_FETCH_SIZE = 2000
+
+# Jumlah titik default dan maksimum untuk GET /sensor-data/range
+DEFAULT_RANGE_POINTS = 1000
+MAX_RANGE_POINTS = 10000
+
+SENSOR_COLUMNS = ["id", "nama_sensor", "tanggal", "nilai", "waktu"]
+
+def make_cursor(row):
+    """Buat cursor pagination "<waktu ISO>,<id>" dari satu baris"""
+    return f"{row['waktu'].isoformat()},{row['id']}"
+
+def parse_cursor(value):
+    """Parse cursor "<waktu ISO>,<id>" menjadi tuple (waktu, id)"""
+    try:
+        waktu, row_id = value.rsplit(",", 1)
+        return datetime.fromisoformat(waktu), int(row_id)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Cursor tidak valid: {value!r} (format: <waktu ISO>,<id>)")
+
+def _keyset_query(before=None, after=None, limit=None):
+    """Susun query keyset di atas (waktu, id); hasil selalu terbaru lebih dulu kecuali `after`"""
+    conditions = []
+    params = []
+
+    if before:
+        conditions.append("(s.waktu, s.id) < (%s, %s)")
+        params.extend(before)
+    if after:
+        conditions.append("(s.waktu, s.id) > (%s, %s)")
+        params.extend(after)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Untuk `after` tanpa `before` ambil dari yang paling dekat dengan cursor
+    order = "ASC" if after and not before else "DESC"
+
+    query = f"""
+    SELECT s.id, d.nama_sensor, s.tanggal, s.nilai, s.waktu
+    FROM sensor s
+    JOIN sensor_device d ON d.id = s.id_device
+    {where}
+    ORDER BY s.waktu {order}, s.id {order}
+    """
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    return query, params, order == "ASC"
+
+def fetch_sensor_page(conn, limit=None, before=None, after=None):
+    """
+    Ambil satu halaman data sensor (terbaru lebih dulu).
+    Mengembalikan (rows, next_cursor, prev_cursor).
+    """
+    page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    query, params, ascending = _keyset_query(before, after, page_size)
+
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    if ascending:
+        rows.reverse()
+
+    # next_cursor -> data yang lebih lama (pakai sebagai `before`)
+    # prev_cursor -> data yang lebih baru (pakai sebagai `after`)
+    has_more = len(rows) == page_size
+    next_cursor = make_cursor(rows[-1]) if rows and (has_more or ascending) else None
+    prev_cursor = make_cursor(rows[0]) if rows else None
+
+    return rows, next_cursor, prev_cursor
+
+def fetch_sensor_delta(conn, last_id, limit=MAX_DELTA_ROWS):
+    """
+    Ambil data dengan id > last_id (urut id naik) dalam format kolumnar.
+    Biaya per panggilan sebanding dengan jumlah data baru, bukan ukuran tabel.
+    Aman karena id sensor terlihat sesuai urutan commit (lihat
+    SENSOR_INSERT_LOCK_KEY di sensor_ingest), jadi id yang lebih kecil tidak
+    bisa muncul setelah client melewatinya.
+    """
+    limit = min(limit or MAX_DELTA_ROWS, MAX_DELTA_ROWS)
+
+    cursor = conn.cursor()
+    cursor.execute("""
+    SELECT s.id, d.nama_sensor, s.nilai, s.waktu
+    FROM sensor s
+    JOIN sensor_device d ON d.id = s.id_device
+    WHERE s.id > %s
+    ORDER BY s.id
+    LIMIT %s
+    """, (last_id, limit))
+    rows = cursor.fetchall()
+    cursor.close()
+
+    return {
+        "id": [row[0] for row in rows],
+        "nama_sensor": [row[1] for row in rows],
+        "nilai": [row[2] for row in rows],
+        "waktu": [_to_json_value(row[3]) for row in rows],
+        "last_id": rows[-1][0] if rows else last_id,
+        "has_more": len(rows) == limit
+    }
+
+# Nilai terbaru per sensor: satu index lookup di (id_device, waktu DESC) untuk
+# setiap baris sensor_device, biayanya sebanding dengan jumlah sensor, bukan jumlah baris
+LATEST_VALUES_CTE = """
+WITH latest AS (
+    SELECT d.id AS id_device, d.nama_sensor, l.nilai, l.waktu
+    FROM sensor_device d
+    CROSS JOIN LATERAL (
+        SELECT s.nilai, s.waktu
+        FROM sensor s
+        WHERE s.id_device = d.id
+        ORDER BY s.waktu DESC
+        LIMIT 1
+    ) l
+)
+"""
+
+# Semua data untuk /sensor-stats dalam satu round trip:
+# total/hari ini dari counter harian (bukan COUNT(*) ke tabel sensor)
+SENSOR_STATS_COLUMNS = """
+    (SELECT COALESCE(SUM(jumlah), 0) FROM sensor_daily_count) AS total,
+    (SELECT COALESCE(SUM(jumlah), 0) FROM sensor_daily_count WHERE tanggal = CURRENT_DATE) AS today_count,
+    (SELECT COALESCE(json_agg(r), '[]') FROM (
+        SELECT s.id, d.nama_sensor, s.tanggal, s.nilai, s.waktu
+        FROM sensor s
+        JOIN sensor_device d ON d.id = s.id_device
+        ORDER BY s.waktu DESC
+        LIMIT 50
+    ) r) AS latest_data
+"""
+
+SENSOR_STATS_QUERY = LATEST_VALUES_CTE + """
+SELECT
+    (SELECT COALESCE(json_agg(json_build_object('nama_sensor', nama_sensor, 'nilai', nilai, 'waktu', waktu)
+                              ORDER BY nama_sensor), '[]') FROM latest) AS latest_values,
+""" + SENSOR_STATS_COLUMNS
+
+# Varian tanpa nilai terbaru per sensor (sudah ada di LatestValueStore)
+SENSOR_COUNTERS_QUERY = "SELECT" + SENSOR_STATS_COLUMNS
+
+def fetch_sensor_stats(conn, include_latest_values=True):
+    """
+    Ambil data /sensor-stats dengan satu query.
+    Mengembalikan dict: total, today_count, latest_data
+    (+ latest_values jika include_latest_values). Acuan baku dari ThresholdCache.
+    """
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute(SENSOR_STATS_QUERY if include_latest_values else SENSOR_COUNTERS_QUERY)
+    stats = cursor.fetchone()
+    cursor.close()
+    return stats
+
+def _to_json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def iter_sensor_rows(limit=None, before=None, after=None, fmt="ndjson"):
+    """
+    Generator streaming data sensor lewat server-side (named) cursor.
+    Memori tetap konstan berapapun ukuran tabel. Dengan `after` saja,
+    data dikirim dari yang terlama ke terbaru.
+    """
+    query, params, _ = _keyset_query(before, after, limit)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor(name="sensor_export_cursor")
+        cursor.itersize = STREAM_FETCH_SIZE
+        try:
+            cursor.execute(query, params)
+
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(SENSOR_COLUMNS)
+                yield buffer.getvalue()
+
+            while True:
+                rows = cursor.fetchmany(STREAM_FETCH_SIZE)
+                if not rows:
+                    break
+
+                if fmt == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    for row in rows:
+                        writer.writerow([_to_json_value(value) for value in row])
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(
+                        json.dumps(dict(zip(SENSOR_COLUMNS, map(_to_json_value, row)))) + "\n"
+                        for row in rows
+                    )
+        finally:
+            cursor.close()
+            conn.rollback()
+
+def iter_sensor_range(conn, nama_sensor, start, end):
+    """
+    Generator (detik, nilai, waktu, id) satu sensor pada [start, end), urut waktu naik.
+    Dibaca lewat named cursor di atas index (id_device, waktu DESC).
+    """
+    cursor = conn.cursor(name="sensor_range_cursor")
+    cursor.itersize = STREAM_FETCH_SIZE
+    try:
+        cursor.execute("""
+        SELECT s.id, s.nilai, s.waktu
+        FROM sensor s
+        JOIN sensor_device d ON d.id = s.id_device
+        WHERE d.nama_sensor = %s AND s.waktu >= %s AND s.waktu < %s
+        ORDER BY s.waktu, s.id
+        """, (nama_sensor, start, end))
+
+        for row_id, nilai, waktu in cursor:
+            yield waktu.timestamp(), nilai, waktu, row_id
+    finally:
+        cursor.close()
+        conn.rollback()
+
+def _merge_archived(archived, live):
+    """
+    Gabungkan data arsip dan database urut waktu; baris yang ada di keduanya
+    (arsip sudah ditulis tapi delete belum di-commit) diambil sekali berdasarkan
+    id. Salinan baris yang sama punya waktu yang sama, jadi cukup mengingat id
+    dalam satu timestamp.
+    """
+    current = None
+    seen = set()
+    for row in heapq.merge(archived, live, key=lambda row: row[0]):
+        if row[0] != current:
+            current = row[0]
+            seen.clear()
+        if row[3] in seen:
+            continue
+        seen.add(row[3])
+        yield row
+
+def fetch_sensor_range(conn, nama_sensor, start, end, points=None, archive=None):
+    """
+    Data satu sensor pada [start, end) yang di-downsample dengan LTTB menjadi
+    paling banyak `points` titik, dalam format kolumnar siap pakai untuk chart.
+    Jika `archive` (SensorArchive) diberikan, data yang sudah diarsipkan ikut digabung.
+    """
+    points = min(points or DEFAULT_RANGE_POINTS, MAX_RANGE_POINTS)
+    raw_count = 0
+
+    def counted(rows):
+        nonlocal raw_count
+        for row in rows:
+            raw_count += 1
+            yield row
+
+    rows = iter_sensor_range(conn, nama_sensor, start, end)
+    if archive is not None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM sensor_device WHERE nama_sensor = %s", (nama_sensor,))
+        device = cursor.fetchone()
+        cursor.close()
+        if device:
+            rows = _merge_archived(archive.iter_range(device[0], start, end), rows)
+
+    sampled = list(lttb(counted(rows), points, start.timestamp(), end.timestamp()))
+
+    return {
+        "nama_sensor": nama_sensor,
+        "from": start,
+        "to": end,
+        "raw_points": raw_count,
+        "points": len(sampled),
+        "waktu": [row[2].isoformat() for row in sampled],
+        "nilai": [row[1] for row in sampled],
+    }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Rollup data sensor per menit, jam dan hari
+
+Setiap tabel rollup menyimpan jumlah/min/max/sum/sum-of-squares per sensor
+per bucket, di-upsert di transaksi yang sama dengan insert data sensor
+(termasuk data terlambat). Query rentang waktu memilih rollup paling kasar
+yang masih memenuhi resolusi yang diminta, sehingga chart bulanan cukup
+membaca ratusan baris, bukan ratusan ribu baris data mentah.
+"""
+
+from collections import namedtuple
+from psycopg2.extras import RealDictCursor, execute_values
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+RollupLevel = namedtuple("RollupLevel", ["name", "seconds", "table"])
+
+# Urut dari paling halus ke paling kasar
+ROLLUP_LEVELS = [
+    RollupLevel("1m", 60, "sensor_rollup_1m"),
+    RollupLevel("1h", 3600, "sensor_rollup_1h"),
+    RollupLevel("1d", 86400, "sensor_rollup_1d"),
+]
+
+# Jumlah titik default untuk query rollup
+DEFAULT_ROLLUP_POINTS = 500
+MAX_ROLLUP_POINTS = 10000
+
+UPSERT_ROLLUP_QUERY = """
+INSERT INTO {table} AS r (id_device, bucket, jumlah, min, max, sum, sumsq)
+VALUES %s
+ON CONFLICT (id_device, bucket) DO UPDATE SET
+    jumlah = r.jumlah + EXCLUDED.jumlah,
+    min = LEAST(r.min, EXCLUDED.min),
+    max = GREATEST(r.max, EXCLUDED.max),
+    sum = r.sum + EXCLUDED.sum,
+    sumsq = r.sumsq + EXCLUDED.sumsq
+"""
+
+def bucket_start(waktu, seconds):
+    """Awal bucket (menit/jam/hari) untuk satu timestamp"""
+    if seconds == 60:
+        return waktu.replace(second=0, microsecond=0)
+    if seconds == 3600:
+        return waktu.replace(minute=0, second=0, microsecond=0)
+    return waktu.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def aggregate_rollups(rows, level):
+    """
+    Agregasi baris sensor (id_device, tanggal, nilai, waktu) ke bucket
+    satu level. Hasil diurutkan per (id_device, bucket) agar writer paralel
+    mengunci baris rollup dengan urutan yang sama.
+    """
+    buckets = {}
+    for id_device, _, nilai, waktu in rows:
+        key = (id_device, bucket_start(waktu, level.seconds))
+        agg = buckets.get(key)
+        if agg is None:
+            buckets[key] = [1, nilai, nilai, nilai, nilai * nilai]
+        else:
+            agg[0] += 1
+            agg[1] = min(agg[1], nilai)
+            agg[2] = max(agg[2], nilai)
+            agg[3] += nilai
+            agg[4] += nilai * nilai
+    return [key + tuple(agg) for key, agg in sorted(buckets.items())]
+
+def update_rollups(cursor, rows):
+    """Upsert semua level rollup untuk baris yang baru di-insert (commit oleh pemanggil)"""
+    for level in ROLLUP_LEVELS:
+        values = aggregate_rollups(rows, level)
+        execute_values(cursor, UPSERT_ROLLUP_QUERY.format(table=level.table), values, page_size=len(values))
+
+def choose_rollup(start, end, resolution=None, points=None):
+    """
+    Pilih rollup paling kasar dengan ukuran bucket <= resolusi yang diminta.
+    Resolusi (detik) diambil dari `resolution` atau dari (end - start) / points,
+    lalu dibulatkan ke kelipatan terdekat ukuran bucket rollup agar setiap
+    bucket rollup masuk utuh ke satu bucket output (90 menit dari rollup 1h
+    menjadi 2 jam). Mengembalikan (level atau None untuk data mentah,
+    resolusi dalam detik).
+    """
+    if resolution is None:
+        points = min(points or DEFAULT_ROLLUP_POINTS, MAX_ROLLUP_POINTS)
+        resolution = (end - start).total_seconds() / points
+    # Jangan sampai jumlah bucket melebihi batas
+    min_resolution = (end - start).total_seconds() / MAX_ROLLUP_POINTS
+    resolution = max(int(resolution), 1, int(min_resolution))
+
+    chosen = None
+    for level in ROLLUP_LEVELS:
+        if level.seconds <= resolution:
+            chosen = level
+    if chosen is not None:
+        multiple = max(round(resolution / chosen.seconds), math.ceil(min_resolution / chosen.seconds), 1)
+        resolution = multiple * chosen.seconds
+    return chosen, resolution
+
+# Bucket output = kelipatan `resolution` detik sejak epoch (timestamp tanpa timezone)
+_BUCKET_EXPR = "TIMESTAMP 'epoch' + floor(extract(epoch FROM {column}) / %(resolution)s) * %(resolution)s * INTERVAL '1 second'"
+
+_ROLLUP_SERIES_QUERY = """
+SELECT {bucket} AS bucket,
+       SUM(r.jumlah)::BIGINT AS jumlah,
+       MIN(r.min) AS min,
+       MAX(r.max) AS max,
+       SUM(r.sum) AS sum,
+       SUM(r.sumsq) AS sumsq
+FROM {table} r
+JOIN sensor_device d ON d.id = r.id_device
+WHERE d.nama_sensor = %(sensor)s AND r.bucket >= %(start)s AND r.bucket < %(end)s
+GROUP BY 1
+ORDER BY 1
+"""
+
+_RAW_SERIES_QUERY = """
+SELECT {bucket} AS bucket,
+       COUNT(*) AS jumlah,
+       MIN(s.nilai) AS min,
+       MAX(s.nilai) AS max,
+       SUM(s.nilai) AS sum,
+       SUM(s.nilai * s.nilai) AS sumsq
+FROM sensor s
+JOIN sensor_device d ON d.id = s.id_device
+WHERE d.nama_sensor = %(sensor)s AND s.waktu >= %(start)s AND s.waktu < %(end)s
+GROUP BY 1
+ORDER BY 1
+"""
+
+def fetch_rollup_series(conn, nama_sensor, start, end, resolution=None, points=None):
+    """
+    Ambil deret agregat satu sensor pada [start, end) dalam format kolumnar:
+    bucket, jumlah, min, max, avg, stddev per bucket. `resolution_s` adalah
+    resolusi yang benar-benar dipakai (bisa berbeda dari yang diminta).
+    """
+    requested = resolution
+    level, resolution = choose_rollup(start, end, resolution, points)
+    params = {"sensor": nama_sensor, "resolution": resolution}
+
+    if level is None:
+        query = _RAW_SERIES_QUERY.format(bucket=_BUCKET_EXPR.format(column="s.waktu"))
+        params.update(start=start, end=end)
+    else:
+        query = _ROLLUP_SERIES_QUERY.format(bucket=_BUCKET_EXPR.format(column="r.bucket"), table=level.table)
+        # Bucket rollup yang sebagian berada di dalam rentang tetap diikutkan
+        params.update(start=bucket_start(start, level.seconds), end=end)
+
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    series = {"bucket": [], "jumlah": [], "min": [], "max": [], "avg": [], "stddev": []}
+    for row in rows:
+        count = row["jumlah"]
+        avg = row["sum"] / count
+        variance = max(row["sumsq"] / count - avg * avg, 0.0)
+        series["bucket"].append(row["bucket"])
+        series["jumlah"].append(int(count))
+        series["min"].append(row["min"])
+        series["max"].append(row["max"])
+        series["avg"].append(avg)
+        series["stddev"].append(variance ** 0.5)
+
+    return {
+        "nama_sensor": nama_sensor,
+        "source": level.table if level else "sensor",
+        "resolution_s": resolution,
+        "requested_resolution_s": requested,
+        "from": start,
+        "to": end,
+        "points": len(rows),
+        **series,
+    }
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Cache acuan_baku dengan versi dan invalidasi write-through
+
+Endpoint POST/PUT/DELETE /acuan-baku memanggil pg_notify() di transaksi
+yang sama dengan perubahan data. Setiap worker punya thread listener
+(LISTEN acuan_baku_changed) yang meng-invalidate cache-nya, sehingga
+pembacaan tidak perlu query ke database selama tidak ada perubahan.
+"""
+
+from psycopg2.extras import RealDictCursor
+import logging
+import select
+import threading
+import time
+
+import psycopg2
+
+from circuit_breaker import CircuitOpen
+from database_config import DB_CONFIG, DB_UNAVAILABLE_ERRORS, get_db_connection
+from threshold_engine import ThresholdEngine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "acuan_baku_changed"
+
+ACUAN_BAKU_QUERY = "SELECT id, min, max, status FROM acuan_baku ORDER BY id"
+
+def notify_acuan_baku_changed(cursor, payload=""):
+    """Kirim notifikasi perubahan; terkirim saat transaksi di-commit"""
+    cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, str(payload)))
+
+class ThresholdCache:
+    """Cache baris acuan_baku, di-reload hanya setelah ada invalidasi"""
+
+    def __init__(self, breaker=None):
+        # breaker: CircuitBreaker opsional untuk query dengan koneksi sendiri
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._rows = None
+        self._version = 0          # Naik setiap invalidasi
+        self._loaded_version = -1  # Versi data yang sedang di-cache
+        self._listening = False
+        self._listener = None
+        self._stop = threading.Event()
+        self._engine = None
+        self._engine_rows = None
+        self._stats = {"hits": 0, "loads": 0, "invalidations": 0, "stale": 0}
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self):
+        """Tandai cache basi; dipanggil setelah mutasi atau saat ada NOTIFY"""
+        with self._lock:
+            self._version += 1
+            self._stats["invalidations"] += 1
+
+    def get(self, conn=None):
+        """
+        List baris acuan_baku (dict id, min, max, status) urut id.
+        Selama listener tidak aktif, setiap panggilan membaca ulang dari database.
+        Jika database tidak tersedia, data terakhir yang pernah dimuat dipakai
+        (cooling dan alert tetap jalan selama database mati).
+        """
+        with self._lock:
+            if self._listening and self._rows is not None and self._loaded_version == self._version:
+                self._stats["hits"] += 1
+                return self._rows
+            version = self._version
+
+        try:
+            if conn is not None:
+                rows = self._load(conn)
+            elif self.breaker is not None:
+                rows = self.breaker.call(self._load_own)
+            else:
+                rows = self._load_own()
+        except (CircuitOpen,) + DB_UNAVAILABLE_ERRORS as e:
+            with self._lock:
+                if self._rows is None:
+                    raise
+                self._stats["stale"] += 1
+                logger.debug(f"Using cached acuan_baku, database unavailable: {e}")
+                return self._rows
+
+        with self._lock:
+            # Jangan timpa jika ada invalidasi selama query berjalan
+            if version == self._version:
+                self._rows = rows
+                self._loaded_version = version
+            self._stats["loads"] += 1
+        return rows
+
+    def get_engine(self, conn=None):
+        """ThresholdEngine hasil kompilasi, dibuat ulang hanya jika data acuan berubah"""
+        rows = self.get(conn)
+        with self._lock:
+            if self._engine is None or self._engine_rows is not rows:
+                self._engine = ThresholdEngine(rows)
+                self._engine_rows = rows
+            return self._engine
+
+    def _load_own(self):
+        with get_db_connection() as conn:
+            return self._load(conn)
+
+    def _load(self, conn):
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(ACUAN_BAKU_QUERY)
+        rows = [dict(row) for row in cursor.fetchall()]
+        cursor.close()
+        return rows
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "version": self._version,
+                "cached": self._rows is not None and self._loaded_version == self._version,
+                "listening": self._listening,
+            })
+        return stats
+
+    def start_listener(self):
+        """Jalankan thread LISTEN untuk invalidasi lintas worker"""
+        if self._listener and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen_loop, name="acuan-baku-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        self._stop.set()
+        if self._listener:
+            self._listener.join(5)
+            self._listener = None
+
+    def _listen_loop(self):
+        backoff = 1
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**DB_CONFIG)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                cursor.close()
+
+                # Perubahan selama listener mati mungkin terlewat
+                self.invalidate()
+                with self._lock:
+                    self._listening = True
+                logger.info(f"Listening for {NOTIFY_CHANNEL} notifications")
+                backoff = 1
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.invalidate()
+            except Exception as e:
+                logger.error(f"Acuan baku listener error: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                with self._lock:
+                    self._listening = False
+                if conn is not None:
+                    conn.close()
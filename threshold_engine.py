@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Threshold engine: klasifikasi nilai sensor berdasarkan band acuan_baku
+
+Setiap baris acuan_baku adalah band [min, max] dengan label status
+(Normal/Waspada/Bahaya, label lain dianggap Normal). Nilai mendapat status
+dari band paling ringan yang memuatnya; nilai di luar semua band berstatus
+BAHAYA. Semua batas band dikompilasi menjadi interval index yang terurut,
+sehingga klasifikasi cukup satu binary search (O(log bands)).
+"""
+
+from bisect import bisect_left
+from collections import namedtuple
+
+SEVERITY_NORMAL = 0
+SEVERITY_WASPADA = 1
+SEVERITY_BAHAYA = 2
+
+SEVERITY_BY_LABEL = {
+    "normal": SEVERITY_NORMAL,
+    "waspada": SEVERITY_WASPADA,
+    "bahaya": SEVERITY_BAHAYA,
+}
+
+ALERT_LEVELS = {
+    SEVERITY_NORMAL: "success",
+    SEVERITY_WASPADA: "warning",
+    SEVERITY_BAHAYA: "danger",
+}
+
+Classification = namedtuple("Classification", ["severity", "status", "alert_level"])
+
+NO_THRESHOLDS = Classification(SEVERITY_NORMAL, "Normal", "info")
+
+def band_severity(label):
+    """Severity dari label status acuan_baku (label tidak dikenal = Normal)"""
+    if not label:
+        return SEVERITY_NORMAL
+    return SEVERITY_BY_LABEL.get(label.strip().split()[0].lower(), SEVERITY_NORMAL)
+
+class IntervalIndex:
+    """
+    Interval index untuk satu set band.
+
+    Batas-batas band b0 < b1 < ... < bk membagi sumbu nilai menjadi
+    2k+1 region: (-inf, b0), [b0], (b0, b1), [b1], ..., (bk, inf).
+    Status setiap region dihitung sekali saat kompilasi.
+    """
+
+    def __init__(self, bands):
+        # bands: list of (min, max, severity), urutan = prioritas saat severity sama
+        self.bands = [band for band in bands if band[0] <= band[1]]
+        self.bounds = sorted({value for band in self.bands for value in band[:2]})
+
+        normal = [band for band in self.bands if band[2] == min(b[2] for b in self.bands)] if self.bands else []
+        self._normal_low = min(band[0] for band in normal) if normal else None
+        self._normal_high = max(band[1] for band in normal) if normal else None
+
+        self.regions = [self._classify_point(value) for value in self._representatives()]
+
+    @property
+    def normal_range(self):
+        """(min, max) gabungan band paling ringan, atau (None, None) tanpa acuan"""
+        return self._normal_low, self._normal_high
+
+    def _representatives(self):
+        bounds = self.bounds
+        if not bounds:
+            return [0.0]
+        points = [bounds[0] - 1.0]
+        for i, bound in enumerate(bounds):
+            points.append(bound)
+            upper = bounds[i + 1] if i + 1 < len(bounds) else bound + 2.0
+            points.append((bound + upper) / 2)
+        return points
+
+    def _direction(self, value):
+        if self._normal_high is not None and value > self._normal_high:
+            return "Tinggi"
+        if self._normal_low is not None and value < self._normal_low:
+            return "Rendah"
+        return None
+
+    def _classify_point(self, value):
+        """Klasifikasi langsung (linear), hanya dipakai saat kompilasi"""
+        if not self.bands:
+            return NO_THRESHOLDS
+
+        containing = [band for band in self.bands if band[0] <= value <= band[1]]
+        direction = self._direction(value)
+
+        if not containing:
+            if direction:
+                status = f"BAHAYA - Nilai Terlalu {direction}"
+            else:
+                status = "BAHAYA - Nilai di Luar Acuan Baku"
+            return Classification(SEVERITY_BAHAYA, status, ALERT_LEVELS[SEVERITY_BAHAYA])
+
+        severity = min(band[2] for band in containing)
+        if severity == SEVERITY_NORMAL:
+            return Classification(severity, "Normal", ALERT_LEVELS[severity])
+
+        label = "WASPADA" if severity == SEVERITY_WASPADA else "BAHAYA"
+        status = f"{label} - Nilai Terlalu {direction}" if direction else label
+        return Classification(severity, status, ALERT_LEVELS[severity])
+
+    def _region(self, value, start=0):
+        i = bisect_left(self.bounds, value, start)
+        if i < len(self.bounds) and self.bounds[i] == value:
+            return 2 * i + 1, i
+        return 2 * i, i
+
+    def classify(self, value):
+        """Klasifikasi satu nilai dengan binary search"""
+        if not self.bounds:
+            return self.regions[0]
+        return self.regions[self._region(value)[0]]
+
+    def classify_sorted(self, values):
+        """
+        Klasifikasi banyak nilai yang sudah terurut naik dalam satu sweep;
+        posisi pencarian tidak pernah mundur.
+        """
+        if not self.bounds:
+            return [self.regions[0]] * len(values)
+        results = []
+        position = 0
+        for value in values:
+            region, position = self._region(value, position)
+            results.append(self.regions[region])
+        return results
+
+class ThresholdEngine:
+    """Interval index per sensor (band tanpa nama_sensor berlaku untuk semua sensor)"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        global_bands = []
+        sensor_bands = {}
+        for row in rows:
+            band = (row["min"], row["max"], band_severity(row.get("status")))
+            sensor = row.get("nama_sensor")
+            if sensor:
+                sensor_bands.setdefault(sensor, []).append(band)
+            else:
+                global_bands.append(band)
+
+        self.default_index = IntervalIndex(global_bands)
+        self.sensor_indexes = {name: IntervalIndex(bands) for name, bands in sensor_bands.items()}
+
+    def index_for(self, nama_sensor):
+        return self.sensor_indexes.get(nama_sensor, self.default_index)
+
+    def normal_range(self, nama_sensor):
+        """Rentang normal (min, max) untuk satu sensor"""
+        return self.index_for(nama_sensor).normal_range
+
+    def classify(self, nama_sensor, value):
+        """Klasifikasi nilai terbaru satu sensor"""
+        return self.index_for(nama_sensor).classify(value)
+
+    def classify_many(self, readings):
+        """
+        Klasifikasi banyak (nama_sensor, nilai) sekaligus: dikelompokkan per
+        index, diurutkan, lalu di-sweep sekali per index. Hasil sesuai urutan input.
+        """
+        groups = {}
+        for position, (nama_sensor, value) in enumerate(readings):
+            index = self.index_for(nama_sensor)
+            groups.setdefault(id(index), (index, []))[1].append((value, position))
+
+        results = [None] * len(readings)
+        for index, items in groups.values():
+            items.sort()
+            classified = index.classify_sorted([value for value, _ in items])
+            for (_, position), classification in zip(items, classified):
+                results[position] = classification
+        return results